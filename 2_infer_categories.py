@@ -1,5 +1,11 @@
+import time
+
 import pandas as pd
-import re
+
+from search_engine.categories import add_inferred_categories
+
+# Processes for category inference (None = in-process; worth raising for multi-million-row exports)
+INFER_WORKERS = None
 
 # Load the exported dataset
 df = pd.read_csv("products_clean.csv")
@@ -7,47 +13,11 @@ df = pd.read_csv("products_clean.csv")
 print(f"Total products: {len(df)}")
 print(f"Missing category_name before: {df['category_name'].isna().sum()}")
 
-# Define keyword → category mapping
-category_map = {
-    r"\biphone|apple\b": "iPhones",
-    r"\bsamsung|infinix|tecno|xiaomi|itel|oppo|android\b": "Android Phones",
-    r"\blaptop|macbook|hp|dell|lenovo|notebook|ultrabook\b": "Laptops & Ultrabooks",
-    r"\binverter|battery|ups|power supply\b": "Inverters",
-    r"\bperfume|fragrance|cologne|deodorant\b": "Perfumes",
-    r"\bshoe|sandal|sneaker|heel|flipflop\b": "Shoes",
-    r"\bbag|backpack|handbag|tote\b": "Bags",
-    r"\bskincare|serum|moisturizer|cleanser|toner|cream\b": "Skincare",
-    r"\btv|television|led\b": "Televisions",
-    r"\bblender|toaster|microwave|kettle|appliance\b": "Small Kitchen Appliances",
-    r"\bjean|shirt|dress|trouser|fashion|top|clothing\b": "Fashion",
-    r"\bbaby|kid|children\b": "Baby & Kids",
-    r"\bfitness|gym|dumbbell|treadmill|exercise|workout\b": "Sport & Fitness",
-    r"\bshampoo|conditioner|hair\b": "Haircare",
-    r"\bwatch|smartwatch\b": "Wearables",
-    r"\bspeaker|earbud|soundbar|headphone\b": "Audio & Wearables"
-}
-
-# Function to infer category
-def infer_category(text):
-    if pd.isna(text):
-        return None
-    text = text.lower()
-    for pattern, category in category_map.items():
-        if re.search(pattern, text):
-            return category
-    return None
-
-# Apply inference to missing categories
-missing_mask = df["category_name"].isna()
-df.loc[missing_mask, "inferred_category"] = (
-    df.loc[missing_mask, "name"].fillna("") + " " +
-    df.loc[missing_mask, "description"].fillna("")
-).apply(infer_category)
-
-# Fill missing categories
-df["category_final"] = df["category_name"]
-df.loc[df["category_final"].isna(), "category_final"] = df["inferred_category"]
-df["category_final"].fillna("Unknown", inplace=True)
+# Keyword → category mapping and the compiled matcher live in search_engine.categories
+# Apply inference to missing categories and fill category_final
+start = time.perf_counter()
+df = add_inferred_categories(df, workers=INFER_WORKERS)
+print(f"⏱️ Inference took {time.perf_counter() - start:.2f}s")
 
 # Summary
 filled_count = df["inferred_category"].notna().sum()
@@ -13,7 +13,7 @@ DB_NAME = os.getenv("DB_NAME")
 
     
 
-engine = sqlalchemy.create_engine(
+engine = create_engine(
     f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
 )
 # Example query to fetch data from a specific table
@@ -1,95 +1,88 @@
 # explore_products.py
 
 import pandas as pd
-from sqlalchemy import create_engine
+
+from search_engine.products_db import connect, export_products
 
 # ------------------------------
 # 1. Database connection
 # ------------------------------
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_HOST = os.getenv("DB_HOST")
-DB_NAME = os.getenv("DB_NAME")
+# connect() reads DB_URL, or builds a Postgres URL from DB_USER, DB_PASSWORD,
+# DB_HOST, DB_PORT and DB_NAME
+engine = connect()
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{database}"
-)
+# Chunk size and memory ceiling for the streaming export
+CHUNK_ROWS = 50_000
+MAX_MEMORY_MB = 256
 
 # ------------------------------
-# 2. Pull full products dataset with category names
+# 2. Stream the full products dataset with category names
 # ------------------------------
-query = """
-SELECT 
-    p.id,
-    p.name,
-    p.description,
-    p.category_id,
-    c.name AS category_name,
-    p.brand_id,
-    p.specifications,
-    p.status,
-    p.price
-FROM products p
-LEFT JOIN categories c
-ON p.category_id = c.id;
-"""
+# The table is read through a server-side cursor in chunks; each chunk is
+# cleaned (step 7) and appended to products_clean.csv, and only the
+# statistics below are kept in memory.
+missing_counts = None
+category_counts = pd.Series(dtype="int64")
+cleaned_categories = set()
+samples = []
+
+
+def collect_stats(chunk):
+    global missing_counts, category_counts
+    raw = chunk.drop(columns=['category_name_clean', 'name_clean', 'description_clean'])
+    chunk_missing = raw.isnull().sum()
+    missing_counts = chunk_missing if missing_counts is None else missing_counts.add(chunk_missing, fill_value=0)
+    category_counts = category_counts.add(chunk['category_name'].value_counts(), fill_value=0)
+    cleaned_categories.update(chunk['category_name_clean'].unique())
+    if sum(len(s) for s in samples) < 20:
+        samples.append(chunk.head(20))
 
-# Load into pandas DataFrame
-df = pd.read_sql_query(query, engine)
+
+report = export_products(engine, "products_clean.csv", chunk_rows=CHUNK_ROWS,
+                         max_memory_mb=MAX_MEMORY_MB, on_chunk=collect_stats)
+sample = pd.concat(samples).head(20) if samples else pd.DataFrame()
 
 # ------------------------------
 # 3. Inspect dataset shape
 # ------------------------------
-print(f"Total products: {df.shape[0]}")
-print(f"Total columns: {df.shape[1]}\n")
+print(f"Total products: {report['rows']}")
+print(f"Total columns: {len(missing_counts) if missing_counts is not None else 0}\n")
 
 # ------------------------------
 # 4. Check missing/null fields
 # ------------------------------
 print("Missing/null values per column:")
-print(df.isnull().sum(), "\n")
+print(missing_counts.astype("int64") if missing_counts is not None else "No rows", "\n")
 
 # ------------------------------
 # 5. Preview first 20 rows
 # ------------------------------
 print("Sample products (first 20 rows):")
-print(df.head(20), "\n")
+print(sample.drop(columns=['category_name_clean', 'name_clean', 'description_clean'], errors='ignore'), "\n")
 
 # ------------------------------
 # 6. Analyze category distribution
 # ------------------------------
 print("Category distribution (top 20 categories):")
-category_counts = df['category_name'].value_counts()
-print(category_counts.head(20), "\n")
+print(category_counts.astype("int64").sort_values(ascending=False).head(20), "\n")
 
 # ------------------------------
-# 7. Clean category names for search
+# 7. Clean category names, product names and descriptions for search
 # ------------------------------
-df['category_name_clean'] = (
-    df['category_name']
-    .fillna("unknown")  # handle missing categories
-    .str.lower()        # lowercase
-    .str.strip()        # remove leading/trailing whitespace
-    .str.replace(r'\s+', ' ', regex=True)           # normalize spaces
-    .str.replace(r'[^\w\s]', '', regex=True)       # remove special characters
-)
-
+# clean_products() is applied to every chunk during the export
 print("Cleaned category names (unique values):")
-print(df['category_name_clean'].unique(), "\n")
+print(sorted(cleaned_categories), "\n")
 
 # ------------------------------
 # 8. Optional: Preview product names/descriptions
 # ------------------------------
-df['name_clean'] = df['name'].fillna("").str.lower().str.strip()
-df['description_clean'] = df['description'].fillna("").str.lower().str.strip()
-
 print("Sample cleaned product names and descriptions:")
-print(df[['name_clean', 'description_clean']].head(10))
+print(sample[['name_clean', 'description_clean']].head(10) if len(sample) else "No rows")
 
-# Export current data to CSV for next step
-df.to_csv("products_clean.csv", index=False)
-print("✅ Exported cleaned data to products_clean.csv")
+# Export summary (the CSV was written incrementally in step 2)
+print(f"✅ Exported cleaned data to products_clean.csv "
+      f"({report['rows_per_second']} rows/s, {report['chunks']} chunks, "
+      f"largest chunk {report['peak_chunk_mb']} MB)")
 
 
-# Note: Further steps like inferring categories or boosting would be done in subsequent scripts.
\ No newline at end of file
+# Note: Further steps like inferring categories or boosting would be done in subsequent scripts.
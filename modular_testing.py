@@ -3,117 +3,172 @@ Interactive Search Engine Testing Suite
 Run different testing modes to validate search quality
 """
 
+import os
 import pandas as pd
-from rapidfuzz import fuzz
 import sys
+import time
+
+from search_engine import Catalog, NgramIndex, QueryTrace, SearchCache, SearchEngine, StageCounters, compile_rules
+from search_engine.autocomplete import AutocompleteIndex
+from search_engine.batch import run_batch
+from search_engine.bench import query_mix
+from search_engine.cache import config_fingerprint
+from search_engine.catalog import load_boost_dict, read_products
+from search_engine.scoring import measure_description_agreement
+from search_engine.ngram_index import measure_recall
+from search_engine.snapshot import SNAPSHOT_DIR, SPELLING_FILE, StaleSnapshotError, load_snapshot
+from search_engine.spelling import SpellingIndex
+from search_engine.synonyms import SynonymTable
 
 # ==========================================
 # LOAD YOUR SEARCH ALGORITHM
 # ==========================================
 
-# Load products and category boosts
-products = pd.read_csv("products_with_inferred_categories.csv")
-boost_dict = pd.read_csv('category_boost_fixed.csv').set_index('category')['boost'].to_dict()
-boost_dict = {k.lower(): v for k, v in boost_dict.items()}
-
-# Category filters
-CATEGORY_FILTERS = {
-    'fryer': ['microwaves', 'kitchen'],
-    'chair': ['chairs', 'furniture', 'office desks'],
-    'wig': ['wigs', 'hair', 'wigs and weaves'],
-    'jeans': ['fashion', 'trousers', 'jeans'],
-    'samba': ['female shoes', 'male shoes', 'sports shoes', 'shoes']
-}
-
-# Minimum score thresholds
-MIN_SCORE_THRESHOLDS = {
-    'fashion': 80,
-    'electronics': 85,
-    'iphones': 60,
-    'phones & tablets': 70,
-    'default': 60
-}
-
-# Brand blocking
-BRAND_BLOCKS = {
-    'samba': ['samsung', 'sam sung'],
-}
-
-def score_product(product, query):
-    name = str(product['name']).lower()
-    desc = str(product.get('description', '')).lower()
-    category = str(product.get('category_final', 'unknown')).lower()
-    query = query.lower()
-    
-    # Brand blocking
-    if query in BRAND_BLOCKS:
-        blocked_terms = BRAND_BLOCKS[query]
-        if any(blocked in name for blocked in blocked_terms):
-            return 0
-    
-    # Multi-token filter
-    query_tokens = query.split()
-    name_tokens = name.split()
-    
-    if len(query_tokens) > 1:
-        matched_count = sum(
-            1 for qt in query_tokens 
-            if any(fuzz.ratio(qt, nt) > 85 for nt in name_tokens)
-        )
-        if matched_count < len(query_tokens) * 0.6:
-            return 0
-    
-    # Short query strictness
-    if len(query) <= 4:
-        if fuzz.partial_ratio(query, name) < 75:
-            return 0
-    
-    # Base fuzzy scoring
-    name_score = fuzz.partial_ratio(query, name)
-    desc_score = fuzz.partial_ratio(query, desc) if pd.notna(product.get('description')) else 0
-    base_score = 0.85 * name_score + 0.15 * desc_score
-    
-    # Exact substring bonus
-    if query in name:
-        base_score = min(base_score + 15, 100)
-    
-    # Token match bonus
-    has_strong_token_match = any(
-        any(fuzz.ratio(qt, nt) > 85 for nt in name_tokens) for qt in query_tokens
+# Load products and category boosts from the binary snapshot if there is a fresh one
+# (build it with `python -m search_engine.snapshot`), otherwise from the CSVs
+try:
+    catalog, ngram_index, boost_dict = load_snapshot()
+    spelling = SpellingIndex.load(os.path.join(SNAPSHOT_DIR, SPELLING_FILE))
+except (FileNotFoundError, StaleSnapshotError) as exc:
+    if not isinstance(exc, FileNotFoundError):
+        print(f"⚠️ Ignoring stale catalog snapshot: {exc}")
+    products = read_products("products_with_inferred_categories.csv")
+    boost_dict = load_boost_dict('category_boost_fixed.csv')
+
+    # Normalized once here; every search mode scores against this
+    catalog = Catalog(products, boost_dict)
+
+    # Candidate generation: only products sharing a trigram with the query get fuzzy-scored
+    ngram_index = NgramIndex(catalog)
+
+    # Typo correction for query tokens that are not in the catalog vocabulary
+    spelling = SpellingIndex.from_catalog(catalog)
+
+# Searches scan the whole catalog by default: the trigram index can miss results a full
+# scan ranks (check with the index recall mode before passing use_index=True).
+# Queries matching more than MAX_CANDIDATES products fall back to a full scan.
+MAX_CANDIDATES = 5000
+
+# Score descriptions against short summaries instead of the full text (faster, approximate)
+DESCRIPTION_SUMMARIES = False
+
+# Per-stage timings and eliminations for batch runs (see print_stage_report)
+TRACE_SCORING = False
+
+# Results for repeated queries; dropped when the catalog or any config below changes
+search_cache = SearchCache(maxsize=1024, ttl=600)
+
+# Query rewriting: synonym variants -> canonical terms (synonyms.json is re-read when edited)
+synonyms = SynonymTable("synonyms.json")
+
+# Scoring rules: the "modular" profile in search_engine/rules.py
+# (category filters, minimum score thresholds, brand blocks, bonuses and gates).
+# Rules are read-only; to change them compile new ones, e.g.
+# engine.rules = compile_rules("modular", min_score_thresholds={"default": 50})
+rules = compile_rules("modular")
+engine = SearchEngine(catalog, rules, ngram_index, MAX_CANDIDATES)
+
+def score_rows(query, rows=None, stats=None, summarize_descriptions=None):
+    """Scores for the given catalog rows (all if None) under the modular profile"""
+    if summarize_descriptions is None:
+        summarize_descriptions = DESCRIPTION_SUMMARIES
+    return engine.score(query, rows, stats, summarize_descriptions)
+
+def config_version():
+    """Version of the catalog + scoring config that cached results were computed with"""
+    catalog.sync_boosts(boost_dict)
+    return (
+        catalog.version,
+        config_fingerprint(engine.rules.fingerprint, MAX_CANDIDATES, DESCRIPTION_SUMMARIES),
     )
-    if has_strong_token_match:
-        base_score = min(base_score + 10, 100)
-    
-    # Category boost & cross-category penalty
-    boost = boost_dict.get(category, 1.0)
-    boost = max(1.0, min(boost, 3.0))
-    
-    for keyword, allowed_cats in CATEGORY_FILTERS.items():
-        if keyword in query:
-            if not any(allowed in category for allowed in allowed_cats):
-                boost *= 0.2
-    
-    final_score = base_score * boost
-    
-    # Minimum score thresholds
-    min_score = MIN_SCORE_THRESHOLDS.get(category, MIN_SCORE_THRESHOLDS['default'])
-    if final_score < min_score:
-        return 0
-    
-    return final_score
 
-def search(query, top_n=10):
-    results_df = products.copy()
-    results_df['score'] = results_df.apply(lambda x: score_product(x, query), axis=1)
-    results = results_df[results_df['score'] > 0].sort_values(
-        by=['score', 'name'], ascending=[False, True]
-    ).head(top_n)
-    return results[['name', 'category_final', 'score']]
+def rewrite_query(query):
+    """Synonyms first (they cover known misspellings), then typo correction (never of rule keywords)"""
+    return spelling.correct(synonyms.canonicalize(query), keep=engine.rules.keywords)
+
+def search(query, top_n=10, use_index=False):
+    # Variants and typos share the canonical query's cache entries and index lookups
+    query = rewrite_query(query)
+    key = (query.lower(), use_index)
+    version = config_version()
+    results = search_cache.get(key, top_n, version)
+    if results is None:
+        results = _search(query, top_n, use_index)
+        search_cache.put(key, top_n, results, version)
+    return results
+
+def _search(query, top_n, use_index, trace=None):
+    return engine.search(query, top_n, use_index, DESCRIPTION_SUMMARIES, trace)
+
+def uncached_search(query, top_n=10, use_index=False):
+    """search() without the cache (for timing runs such as search_engine.golden)"""
+    return _search(rewrite_query(query), top_n, use_index)
+
+def search_many(queries, top_n=10, use_index=False):
+    """search() for each query; the cache misses are searched together in one engine.search_many()"""
+    keys = [(rewrite_query(query), use_index) for query in queries]
+    version = config_version()
+    results = {}
+    for query, _ in keys:
+        key = (query.lower(), use_index)
+        if key not in results:
+            results[key] = search_cache.get(key, top_n, version)
+    misses = [key[0] for key, found in results.items() if found is None]
+    if misses:
+        for query, found in zip(misses, uncached_search_many(misses, top_n, use_index, rewrite=False)):
+            results[(query, use_index)] = found
+            search_cache.put((query, use_index), top_n, found, version)
+    return [results[(query.lower(), use_index)] for query, _ in keys]
+
+def uncached_search_many(queries, top_n=10, use_index=False, rewrite=True):
+    """search_many() without the cache"""
+    if rewrite:
+        queries = [rewrite_query(query) for query in queries]
+    return engine.search_many(queries, top_n, use_index, DESCRIPTION_SUMMARIES)
+
+def traced_search(query, top_n=10, use_index=False):
+    """search() without the cache, returning (results, QueryTrace)"""
+    query = rewrite_query(query)
+    trace = QueryTrace(query)
+    return _search(query, top_n, use_index, trace), trace
 
 # ==========================================
 # TEST MODES
 # ==========================================
 
+# Worker processes for batch and validation runs (None = all CPUs)
+BATCH_WORKERS = None
+
+def print_batch_report(report):
+    print(f"⏱️  {report['queries']} queries on {report['workers']} workers in "
+          f"{report['wall_seconds']:.2f}s ({report['queries_per_second']:.1f} q/s, "
+          f"mean {report['mean_ms']:.1f}ms, max {report['max_ms']:.1f}ms)")
+
+def print_stage_report(trace):
+    """Per-stage time and eliminations of a QueryTrace or StageCounters"""
+    report = trace.as_dict()
+    print(f"\n🚦 Scoring Pipeline ({report['scored']} candidates scored, "
+          f"{report['total_ms']:.1f}ms total):")
+    print(f"   {'stage':<20} {'ms':>9} {'eliminated':>11}")
+    for stage in report['stages']:
+        print(f"   {stage['stage']:<20} {stage['ms']:>9.2f} {stage['eliminated']:>11}")
+    print(f"   {'passed':<20} {'':>9} {report['passed']:>11}")
+
+# Queries checked by validation_mode (and the index recall report)
+VALIDATION_QUERIES = [
+    "air fryer",
+    "chair", 
+    "wig",
+    "samba",
+    "jeans",
+    "solar inverter",
+    "fridge",
+    "infinix",
+    "tecno",
+    "samsung",
+    "iphone",
+]
+
 def interactive_mode():
     """Single query testing - interactive"""
     print("\n" + "="*80)
@@ -134,6 +189,9 @@ def interactive_mode():
         
         print(f"\n{'='*80}")
         print(f"Results for: '{query}'")
+        canonical = rewrite_query(query)
+        if canonical != query:
+            print(f"🔁 Searched as: '{canonical}'")
         print('='*80)
         
         if len(results) == 0:
@@ -176,10 +234,31 @@ def batch_test_mode():
     
     print(f"\nTesting {len(test_queries)} queries...\n")
     
-    for i, query in enumerate(test_queries, 1):
-        results = search(query, top_n=5)
+    if TRACE_SCORING:
+        batch, report = run_batch(traced_search, test_queries, top_n=5, workers=BATCH_WORKERS)
+        counters = StageCounters()
+        for row in batch:
+            row['results'], trace = row['results']
+            counters.add(trace)
+    else:
+        # One shared pass for the whole batch, timed against searching the queries one by one
+        start = time.perf_counter()
+        for query in test_queries:
+            uncached_search(query, top_n=5)
+        loop_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        batch = [{'query': query, 'results': results} for query, results
+                 in zip(test_queries, uncached_search_many(test_queries, top_n=5))]
+        batch_seconds = time.perf_counter() - start
+        # Through the result cache: the second pass should be all hits
+        for _ in range(2):
+            search_many(test_queries, top_n=5)
+    
+    for i, row in enumerate(batch, 1):
+        query, results = row['query'], row['results']
         
-        print(f"{i}. Query: '{query}'")
+        timing = f" ({row['seconds']*1000:.0f}ms)" if 'seconds' in row else ""
+        print(f"{i}. Query: '{query}'{timing}")
         if len(results) == 0:
             print("   ❌ No results\n")
         else:
@@ -187,6 +266,19 @@ def batch_test_mode():
             result_count = len(results)
             print(f"   ✅ {result_count} results | Top category: {top_cat}")
             print(f"   Top result: {results['name'].iloc[0][:60]}...\n")
+    
+    if TRACE_SCORING:
+        print_batch_report(report)
+        print_stage_report(counters)
+    else:
+        print(f"⏱️  search_many: {len(test_queries)} queries in {batch_seconds:.2f}s "
+              f"({len(test_queries) / batch_seconds:.1f} q/s) vs {loop_seconds:.2f}s one by one "
+              f"({len(test_queries) / loop_seconds:.1f} q/s), {loop_seconds / batch_seconds:.2f}x")
+    
+    stats = search_cache.stats()
+    print(f"🗄️  Cache: {stats['hits']} hits, {stats['misses']} misses, "
+          f"{stats['evictions']} evictions, {stats['expirations']} expirations, "
+          f"{stats['invalidations']} invalidations ({stats['hit_rate']*100:.0f}% hit rate)")
 
 def validation_mode():
     """Full validation with expected categories"""
@@ -194,19 +286,7 @@ def validation_mode():
     print("🧪 VALIDATION MODE")
     print("="*80)
     
-    test_queries = [
-        "air fryer",
-        "chair", 
-        "wig",
-        "samba",
-        "jeans",
-        "solar inverter",
-        "fridge",
-        "infinix",
-        "tecno",
-        "samsung",
-        "iphone",
-    ]
+    test_queries = VALIDATION_QUERIES
     
     INVALID_CATEGORIES = {
         "air fryer": ["iphones", "android phones", "phones & tablets"],
@@ -220,8 +300,10 @@ def validation_mode():
     
     validation_results = []
     
-    for query in test_queries:
-        results = search(query, top_n=10)
+    batch, report = run_batch(search, test_queries, top_n=10, workers=BATCH_WORKERS)
+    
+    for row in batch:
+        query, results = row['query'], row['results']
         
         if len(results) == 0:
             validation_results.append({
@@ -260,6 +342,7 @@ def validation_mode():
     print("\n" + "="*80)
     print(f"📊 Results: {passed}/{len(test_queries)} passed ({passed/len(test_queries)*100:.0f}%)")
     print("="*80)
+    print_batch_report(report)
 
 def detailed_analysis_mode():
     """Deep dive into a single query"""
@@ -307,6 +390,10 @@ def detailed_analysis_mode():
     for bucket, count in buckets.items():
         if count > 0:
             print(f"   {bucket}: {count}")
+    
+    # Where the scoring pipeline spent its time and dropped products
+    _, trace = traced_search(query, top_n=20)
+    print_stage_report(trace)
 
 def compare_queries_mode():
     """Compare results across similar queries"""
@@ -330,8 +417,7 @@ def compare_queries_mode():
     print("Comparison Results")
     print('='*80)
     
-    for query in queries:
-        results = search(query, top_n=5)
+    for query, results in zip(queries, search_many(queries, top_n=5)):
         print(f"\n🔍 '{query}'")
         if len(results) == 0:
             print("   No results")
@@ -340,6 +426,83 @@ def compare_queries_mode():
             print(f"   Categories: {', '.join(results['category_final'].unique()[:3])}")
             print(f"   Top result: {results['name'].iloc[0][:50]}...")
 
+def index_recall_mode():
+    """Check the trigram index against a brute-force scan"""
+    print("\n" + "="*80)
+    print("🗂️  INDEX RECALL MODE")
+    print("="*80)
+    
+    # The validation queries plus the benchmark mix (batch queries, multi-word queries, typos)
+    queries = list(dict.fromkeys(VALIDATION_QUERIES + query_mix()))
+    report = pd.DataFrame(
+        measure_recall(ngram_index, queries, search, top_n=10, max_candidates=MAX_CANDIDATES)
+    )
+    print("\n" + report.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+    
+    dropped = report['dropped'].sum()
+    print("\n" + "="*80)
+    if dropped:
+        print(f"⚠️ Index dropped {dropped} top-10 results that brute force would have ranked")
+    else:
+        print("✅ Index kept every top-10 result that brute force would have ranked")
+    print(f"📊 Average catalog scanned: {report['scanned_pct'].mean():.1f}% "
+          f"({report['full_scan'].sum()} of {len(report)} queries fell back to a full scan)")
+    print("="*80)
+
+def description_benchmark_mode():
+    """Compare summary description scoring with full-text partial_ratio"""
+    print("\n" + "="*80)
+    print("📝 DESCRIPTION SUMMARY BENCHMARK")
+    print("="*80)
+    
+    report = pd.DataFrame(measure_description_agreement(catalog, VALIDATION_QUERIES, score_rows, top_n=10))
+    print("\n" + report.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+    
+    print("\n" + "="*80)
+    print(f"⏱️ Full text: {report['full_ms'].sum():.1f}ms, summaries: {report['summary_ms'].sum():.1f}ms "
+          f"({report['full_ms'].sum() / max(report['summary_ms'].sum(), 1e-9):.1f}x)")
+    print(f"📊 Top-10 agreement: {report['agreement'].mean():.1%}, "
+          f"same order for {report['same_order'].sum()}/{len(report)} queries")
+    print("="*80)
+
+# Built on first use of autocomplete_mode
+autocomplete = None
+
+def autocomplete_mode():
+    """Prefix suggestions, as a storefront search box would request them per keystroke"""
+    global autocomplete
+    print("\n" + "="*80)
+    print("⌨️  AUTOCOMPLETE MODE")
+    print("="*80)
+    
+    if autocomplete is None:
+        start = time.perf_counter()
+        autocomplete = AutocompleteIndex(catalog)
+        print(f"🏗️ Built prefix index: {len(autocomplete.texts)} suggestions, "
+              f"{len(autocomplete.top)} precomputed prefixes in {time.perf_counter() - start:.2f}s")
+    else:
+        # Picks up synced products and boost edits
+        autocomplete.refresh(catalog)
+    print("Type 'quit' or 'exit' to return to menu\n")
+    
+    while True:
+        prefix = input("Type a prefix: ")
+        
+        if prefix.strip().lower() in ['quit', 'exit', 'q']:
+            break
+        
+        start = time.perf_counter()
+        suggestions = autocomplete.complete(prefix)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        if not suggestions:
+            print(f"   ❌ No suggestions ({elapsed_ms:.3f}ms)\n")
+            continue
+        for suggestion in suggestions:
+            icon = "📁" if suggestion['kind'] == 'category' else "🛍️"
+            print(f"   {icon} {suggestion['text']} ({suggestion['weight']:.1f})")
+        print(f"   ⏱️ {elapsed_ms:.3f}ms\n")
+
 # ==========================================
 # MAIN MENU
 # ==========================================
@@ -355,9 +518,12 @@ def main():
         print("  3. Validation Mode - Full quality validation")
         print("  4. Detailed Analysis - Deep dive into one query")
         print("  5. Compare Queries - Compare multiple queries side-by-side")
-        print("  6. Exit")
+        print("  6. Index Recall - Check candidate index against brute force")
+        print("  7. Description Benchmark - Summary vs full-text description scoring")
+        print("  8. Autocomplete - Prefix suggestions per keystroke")
+        print("  9. Exit")
         
-        choice = input("\nEnter choice (1-6): ").strip()
+        choice = input("\nEnter choice (1-9): ").strip()
         
         if choice == '1':
             interactive_mode()
@@ -370,10 +536,16 @@ def main():
         elif choice == '5':
             compare_queries_mode()
         elif choice == '6':
+            index_recall_mode()
+        elif choice == '7':
+            description_benchmark_mode()
+        elif choice == '8':
+            autocomplete_mode()
+        elif choice == '9':
             print("\n👋 Goodbye!")
             break
         else:
-            print("❌ Invalid choice. Please enter 1-6.")
+            print("❌ Invalid choice. Please enter 1-9.")
 
 if __name__ == "__main__":
     try:
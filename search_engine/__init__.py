@@ -0,0 +1,19 @@
+"""
+ChoCho search engine package
+Shared scoring code used by the test scripts in the project root
+"""
+
+from .autocomplete import AutocompleteIndex
+from .cache import SearchCache
+from .catalog import Catalog
+from .engine import SearchEngine
+from .ngram_index import NgramIndex
+from .rules import PROFILES, compile_rules
+from .scoring import score_catalog
+from .token_index import TokenIndex
+from .trace import QueryTrace, StageCounters
+
+__all__ = [
+    "AutocompleteIndex", "Catalog", "SearchCache", "SearchEngine", "NgramIndex", "PROFILES",
+    "compile_rules", "score_catalog", "TokenIndex", "QueryTrace", "StageCounters",
+]
@@ -0,0 +1,208 @@
+"""
+Prefix autocomplete
+Typeahead suggestions from the normalized product names and categories. Every
+suggestion is stored under its first few word starts ("samsung galaxy a14" is
+also found from "galaxy" and "a14") in one sorted array of keys, so a prefix is
+a binary search instead of fuzzy-scoring the catalog. Suggestions are weighted
+by the category boosts of the live products behind them (ties go to the one
+seen first in the catalog). Prefixes shared by many keys get their top
+suggestions precomputed; the rest rank a short key range.
+
+    autocomplete = AutocompleteIndex(catalog)
+    autocomplete.complete("sams")    # [{"text", "kind", "weight"}, ...]
+    autocomplete.refresh(catalog)    # after catalog.apply_changes() / set_boosts()
+"""
+
+import bisect
+
+import numpy as np
+
+TOP_N = 10
+# Prefixes matching more keys than this have their top suggestions precomputed
+PRECOMPUTE_THRESHOLD = 64
+# A suggestion can be found from each of its first MAX_WORDS word starts
+MAX_WORDS = 4
+# Weights that sum back to about zero (every product behind a suggestion is gone)
+MIN_WEIGHT = 1e-9
+# Sorts after any character product text contains: prefix + LAST_CHAR bounds the keys starting with prefix
+LAST_CHAR = "\U0010ffff"
+
+
+def normalize_prefix(prefix):
+    """Lowercased, whitespace collapsed; a trailing space is kept (the last word is complete)"""
+    normalized = " ".join(prefix.lower().split())
+    if normalized and prefix[-1:].isspace():
+        normalized += " "
+    return normalized
+
+
+class AutocompleteIndex:
+    """Sorted suggestion keys with precomputed top suggestions for common prefixes"""
+
+    def __init__(self, catalog, top_n=TOP_N, precompute_threshold=PRECOMPUTE_THRESHOLD, max_words=MAX_WORDS):
+        self.top_n = top_n
+        self.precompute_threshold = precompute_threshold
+        self.max_words = max_words
+
+        # Suggestions: text, "product" or "category", summed boost of their live products
+        self.texts = []
+        self.kinds = []
+        self.suggestion_ids = {}
+        self.weights = np.empty(0, dtype=np.float64)
+
+        # Keys, sorted by texts[key_suggestions[i]][key_offsets[i]:]
+        self.key_suggestions = np.empty(0, dtype=np.int32)
+        self.key_offsets = np.empty(0, dtype=np.int32)
+
+        # Prefix -> suggestion ids, best first
+        self.top = {}
+
+        # Catalog rows already seen, the suggestions they count towards, and whether they do now
+        self.size = 0
+        self.row_names = np.empty(0, dtype=np.int32)  # -1 for products without a name
+        self.category_suggestions = np.empty(0, dtype=np.int32)  # per category code; -1 for missing
+        self.counted = np.empty(0, dtype=bool)
+        self.boost_fingerprint = None
+
+        self.refresh(catalog)
+
+    def _key(self, i):
+        return self.texts[self.key_suggestions[i]][self.key_offsets[i]:]
+
+    def _range(self, prefix, lo=0, hi=None):
+        """Key positions [lo, hi) starting with prefix"""
+        hi = len(self.key_suggestions) if hi is None else hi
+        length = len(prefix)
+        truncated = lambda i: self._key(i)[:length]
+        keys = range(len(self.key_suggestions))
+        start = bisect.bisect_left(keys, prefix, lo, hi, key=truncated)
+        return start, bisect.bisect_right(keys, prefix, start, hi, key=truncated)
+
+    def _rank(self, lo, hi, n):
+        """Ids of the n heaviest suggestions with a key in [lo, hi), ties by id"""
+        ids = np.unique(self.key_suggestions[lo:hi])
+        weights = self.weights[ids]
+        keep = weights > MIN_WEIGHT
+        ids, weights = ids[keep], weights[keep]
+        if len(ids) > n:
+            kth = -np.partition(-weights, n - 1)[n - 1]
+            keep = weights >= kth
+            ids, weights = ids[keep], weights[keep]
+        return ids[np.lexsort((ids, -weights))][:n].tolist()
+
+    def _suggestion(self, text, kind, new_keys):
+        suggestion_id = self.suggestion_ids.get((text, kind))
+        if suggestion_id is None:
+            suggestion_id = self.suggestion_ids[(text, kind)] = len(self.texts)
+            self.texts.append(text)
+            self.kinds.append(kind)
+            offset = 0
+            for word in text.split(" ")[:self.max_words]:
+                new_keys.append((suggestion_id, offset))
+                offset += len(word) + 1
+        return suggestion_id
+
+    def _insert_keys(self, new_keys):
+        """Merge new (suggestion, offset) keys into the sorted key arrays"""
+        new_keys.sort(key=lambda k: self.texts[k[0]][k[1]:])
+        keys = range(len(self.key_suggestions))
+        positions = [
+            bisect.bisect_left(keys, self.texts[s][o:], key=self._key) for s, o in new_keys
+        ] if len(keys) else 0
+        self.key_suggestions = np.insert(self.key_suggestions, positions, [s for s, _ in new_keys]).astype(np.int32)
+        self.key_offsets = np.insert(self.key_offsets, positions, [o for _, o in new_keys]).astype(np.int32)
+
+    def _precompute(self):
+        """Top suggestions of every prefix shared by more than precompute_threshold keys"""
+        self.top = {}
+        # The keys as strings for the duration of the build (plain bisects, no key function)
+        keys = [self._key(i) for i in range(len(self.key_suggestions))]
+        stack = [("", 0, len(keys))]
+        while stack:
+            prefix, lo, hi = stack.pop()
+            if prefix:
+                self.top[prefix] = self._rank(lo, hi, self.top_n)
+            depth = len(prefix)
+            # Keys equal to the prefix sort first; then one child range per next character
+            i = bisect.bisect_left(keys, prefix + "\0", lo, hi)
+            while i < hi:
+                child = keys[i][:depth + 1]
+                j = bisect.bisect_left(keys, child + LAST_CHAR, i, hi)
+                if j - i > self.precompute_threshold:
+                    stack.append((child, i, j))
+                i = j
+
+    def _update_prefixes(self, suggestion_ids):
+        """Recompute the precomputed prefixes of keys of the given suggestions"""
+        prefixes = set()
+        for i in np.flatnonzero(np.isin(self.key_suggestions, list(suggestion_ids))).tolist():
+            key = self._key(i)
+            prefixes.update(key[:length] for length in range(1, len(key) + 1))
+        for prefix in prefixes:
+            lo, hi = self._range(prefix)
+            if hi - lo > self.precompute_threshold:
+                self.top[prefix] = self._rank(lo, hi, self.top_n)
+            else:
+                self.top.pop(prefix, None)
+
+    def refresh(self, catalog):
+        """
+        Catch up with the catalog: index appended rows, drop tombstoned ones and
+        re-weight everything if the boosts changed. Only prefixes of suggestions whose
+        weight changed are recomputed (all of them on the first build or a boost change).
+        """
+        new_keys = []
+        first_build = self.size == 0
+
+        new_rows = range(self.size, catalog.size)
+        self.row_names = np.concatenate([self.row_names, np.asarray([
+            -1 if catalog.name_missing[row] else
+            self._suggestion(" ".join(catalog.names[row].split()), "product", new_keys)
+            for row in new_rows
+        ], dtype=np.int32)])
+        self.category_suggestions = np.concatenate([self.category_suggestions, np.asarray([
+            -1 if category == "nan" else self._suggestion(" ".join(category.split()), "category", new_keys)
+            for category in catalog.category_values[len(self.category_suggestions):]
+        ], dtype=np.int32)])
+        self.counted = np.concatenate([self.counted, np.zeros(len(new_rows), dtype=bool)])
+        self.weights = np.concatenate([self.weights, np.zeros(len(self.texts) - len(self.weights))])
+        self.size = catalog.size
+
+        reweigh = catalog.boost_fingerprint != self.boost_fingerprint
+        if reweigh:
+            self.weights[:] = 0
+            self.counted[:] = False
+            self.boost_fingerprint = catalog.boost_fingerprint
+
+        # Products now counted that were not, and the other way round
+        touched = set()
+        for rows, sign in ((np.flatnonzero(catalog.live & ~self.counted), 1.0),
+                           (np.flatnonzero(self.counted & ~catalog.live), -1.0)):
+            boosts = sign * catalog.boosts[rows]
+            for suggestions in (self.row_names[rows], self.category_suggestions[catalog.category_codes[rows]]):
+                present = suggestions >= 0
+                np.add.at(self.weights, suggestions[present], boosts[present])
+                touched.update(suggestions[present].tolist())
+            self.counted[rows] = sign > 0
+
+        if new_keys:
+            self._insert_keys(new_keys)
+        if first_build or reweigh:
+            self._precompute()
+        elif touched:
+            self._update_prefixes(touched)
+
+    def complete(self, prefix, n=None):
+        """Up to n suggestions for a typed prefix, heaviest first"""
+        n = self.top_n if n is None else n
+        prefix = normalize_prefix(prefix)
+        if not prefix or n <= 0:
+            return []
+        ids = self.top.get(prefix) if n <= self.top_n else None
+        if ids is None:
+            lo, hi = self._range(prefix)
+            ids = self._rank(lo, hi, n)
+        return [
+            {"text": self.texts[i], "kind": self.kinds[i], "weight": float(self.weights[i])}
+            for i in ids[:n]
+        ]
@@ -0,0 +1,102 @@
+"""
+Parallel batch search
+Spreads a list of queries over a process pool. Each worker loads the catalog
+once (by importing the module that defines the search function) and then
+answers its share of the queries.
+"""
+
+import argparse
+import importlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+_search_fn = None
+
+
+def _init_worker(search_fn):
+    global _search_fn
+    _search_fn = search_fn
+
+
+def _run_query(query, top_n):
+    start = time.perf_counter()
+    results = _search_fn(query, top_n)
+    return results, time.perf_counter() - start
+
+
+def run_batch(search_fn, queries, top_n=10, workers=None):
+    """
+    Run search_fn(query, top_n) for every query.
+    search_fn must be a module-level function so worker processes can import it.
+    workers=None uses every CPU; workers=1 runs in this process.
+
+    Returns (rows, report): rows in input order as {"query", "results", "seconds"},
+    report with the total wall time and throughput.
+    """
+    queries = list(queries)
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(queries)))
+    top_ns = [top_n] * len(queries)
+
+    start = time.perf_counter()
+    if workers == 1:
+        _init_worker(search_fn)
+        outcomes = list(map(_run_query, queries, top_ns))
+    else:
+        chunksize = max(1, len(queries) // (workers * 4))
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(search_fn,)) as pool:
+            outcomes = list(pool.map(_run_query, queries, top_ns, chunksize=chunksize))
+    wall = time.perf_counter() - start
+
+    rows = [
+        {"query": query, "results": results, "seconds": seconds}
+        for query, (results, seconds) in zip(queries, outcomes)
+    ]
+    latencies = [row["seconds"] for row in rows]
+    report = {
+        "queries": len(rows),
+        "workers": workers,
+        "wall_seconds": wall,
+        "queries_per_second": len(rows) / wall if wall else 0.0,
+        "mean_ms": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        "max_ms": max(latencies) * 1000 if latencies else 0.0,
+    }
+    return rows, report
+
+
+def load_search_fn(spec):
+    """'module:function' -> the function, e.g. 'modular_testing:search'"""
+    module_name, _, fn_name = spec.partition(':')
+    return getattr(importlib.import_module(module_name), fn_name or 'search')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a file of queries (one per line) through search")
+    parser.add_argument("queries_file")
+    parser.add_argument("--search", default="modular_testing:search", help="module:function to call")
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", help="write per-query results to this CSV")
+    args = parser.parse_args()
+
+    with open(args.queries_file, encoding="utf-8") as f:
+        queries = [line.strip() for line in f if line.strip()]
+
+    rows, report = run_batch(load_search_fn(args.search), queries, args.top_n, args.workers)
+
+    if args.output:
+        frames = [
+            row["results"].assign(query=row["query"], rank=range(1, len(row["results"]) + 1))
+            for row in rows
+        ]
+        pd.concat(frames).to_csv(args.output, index=False)
+
+    print(f"✅ {report['queries']} queries on {report['workers']} workers in {report['wall_seconds']:.2f}s "
+          f"({report['queries_per_second']:.1f} q/s, mean {report['mean_ms']:.1f}ms, max {report['max_ms']:.1f}ms)")
+
+
+if __name__ == "__main__":
+    main()
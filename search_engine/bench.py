@@ -0,0 +1,257 @@
+"""
+Search benchmark suite
+Generates synthetic catalogs (10k / 100k / 1M products by default) with the
+category mix of category_boost_fixed.csv, runs a fixed query mix through typo
+correction + indexed search, and appends one JSON line per run to
+bench_results.jsonl so runs can be compared over time:
+
+    python -m search_engine.bench --sizes 10000 100000
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from .catalog import BOOSTS_CSV, Catalog, load_boost_dict
+from .categories import category_map
+from .engine import SearchEngine
+from .ngram_index import NgramIndex
+from .rules import compile_rules
+from .spelling import SpellingIndex
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+RESULTS_FILE = "bench_results.jsonl"
+
+# Same queries as batch_test_mode() in modular_testing.py
+BATCH_QUERIES = [
+    "iphone", "samsung", "infinix", "tecno", "laptop", "air fryer", "chair", "wig",
+    "jeans", "samba", "solar inverter", "fridge", "headphones", "charger", "shoes",
+]
+MULTI_WORD_QUERIES = [
+    "samsung galaxy pro", "wireless bluetooth headphones", "office chair black",
+    "human hair wig", "solar inverter 2.5kva", "air fryer 4l", "leather shoes men",
+    "usb charger fast", "lg fridge double door", "iphone 14 pro max",
+]
+
+MODIFIERS = [
+    "pro", "max", "mini", "plus", "ultra", "classic", "wireless", "smart", "portable",
+    "black", "white", "blue", "red", "silver", "gold", "2.5kva", "4l", "15", "14",
+    "64gb", "128gb", "original", "new", "premium", "digital", "double", "fast",
+]
+DESCRIPTION_WORDS = [
+    "quality", "durable", "with", "for", "and", "the", "home", "office", "daily", "use",
+    "warranty", "design", "lightweight", "easy", "to", "clean", "long", "lasting",
+    "battery", "power", "comfortable", "stylish", "modern", "genuine", "brand", "new",
+    "sealed", "delivery", "available", "nationwide", "best", "price", "size", "colour",
+]
+# Categories the batch queries target that category_map has no keywords for
+EXTRA_CATEGORY_KEYWORDS = {
+    "Kitchen": ["air fryer", "fridge", "refrigerator", "kettle", "pot"],
+    "Furniture": ["chair", "office chair", "table", "sofa", "desk"],
+    "Wigs": ["wig", "human hair wig", "bone straight", "frontal"],
+    "Sports Shoes": ["samba", "sneaker", "trainer", "running shoe"],
+    "Chargers": ["charger", "usb cable", "power bank", "adapter"],
+}
+BRANDS = ["samsung", "apple", "tecno", "infinix", "hp", "lg", "adidas", "nike", "itel", "oppo", "xiaomi"]
+
+
+def _category_keywords(categories):
+    """Category -> words its product names are built from (category_map keywords if it has some)"""
+    keywords_by_category = {category.lower(): words for category, words in EXTRA_CATEGORY_KEYWORDS.items()}
+    for pattern, category in category_map.items():
+        keywords_by_category[category.lower()] = [w.replace(r"\b", "") for w in pattern.split("|")]
+    return {
+        category: keywords_by_category.get(category.lower()) or category.lower().replace("&", " ").split()
+        for category in categories
+    }
+
+
+def generate_catalog(size, categories=None, seed=0, missing_description=0.15):
+    """Synthetic products DataFrame (id, name, description, category_final)"""
+    if not categories:
+        categories = sorted(set(category_map.values()) | set(EXTRA_CATEGORY_KEYWORDS))
+    keywords = _category_keywords(categories)
+    rng = np.random.default_rng(seed)
+
+    # Skewed category mix: a few big categories and a long tail
+    weights = 1.0 / np.arange(1, len(categories) + 1) ** 0.8
+    category_at = rng.choice(len(categories), size=size, p=weights / weights.sum())
+
+    names = []
+    descriptions = []
+    for i in range(size):
+        category = categories[category_at[i]]
+        words = keywords[category]
+        name = [words[rng.integers(len(words))]]
+        if rng.random() < 0.5:
+            name.insert(0, BRANDS[rng.integers(len(BRANDS))])
+        name += [MODIFIERS[j] for j in rng.integers(len(MODIFIERS), size=rng.integers(1, 5))]
+        names.append(" ".join(name).title())
+
+        if rng.random() < missing_description:
+            descriptions.append(None)
+        else:
+            count = rng.integers(15, 80)
+            filler = [DESCRIPTION_WORDS[j] for j in rng.integers(len(DESCRIPTION_WORDS), size=count)]
+            filler[::7] = [words[j] for j in rng.integers(len(words), size=len(filler[::7]))]
+            descriptions.append(" ".join(filler))
+
+    return pd.DataFrame({
+        "id": np.arange(1, size + 1),
+        "name": names,
+        "description": descriptions,
+        "category_final": [categories[c] for c in category_at],
+    })
+
+
+def make_typo(word, rng):
+    """One deletion, transposition or substitution in word"""
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    kind = rng.randrange(3)
+    if kind == 0:
+        return word[:i] + word[i + 1:]
+    if kind == 1:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word[:i] + rng.choice("aeiourstn") + word[i + 1:]
+
+
+def query_mix(seed=0, typos=10):
+    """Batch test queries, typo'd versions of some of them, and multi-word queries"""
+    rng = random.Random(seed)
+    typo_queries = [make_typo(rng.choice(BATCH_QUERIES), rng) for _ in range(typos)]
+    return BATCH_QUERIES + typo_queries + MULTI_WORD_QUERIES
+
+
+def _percentile(sorted_values, pct):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def run_size(size, profile="modular", rounds=3, seed=0, use_index=False, boosts_csv=BOOSTS_CSV):
+    """Build a synthetic catalog of `size` products, search it, and return the measurements"""
+    boost_dict = load_boost_dict(boosts_csv) if boosts_csv and os.path.exists(boosts_csv) else {}
+    categories = sorted(boost_dict) if boost_dict else None
+
+    start = time.perf_counter()
+    products = generate_catalog(size, categories, seed)
+    generate_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    catalog = Catalog(products, boost_dict)
+    catalog_seconds = time.perf_counter() - start
+    del products
+
+    # Always built, so its build time and memory are reported; use_index only picks the search path
+    start = time.perf_counter()
+    ngram_index = NgramIndex(catalog)
+    index_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    spelling = SpellingIndex.from_catalog(catalog)
+    spelling_seconds = time.perf_counter() - start
+
+    engine = SearchEngine(catalog, compile_rules(profile), ngram_index, max_candidates=5000)
+    queries = query_mix(seed)
+
+    latencies = []
+    run_start = time.perf_counter()
+    for _ in range(rounds):
+        for query in queries:
+            start = time.perf_counter()
+            engine.search(spelling.correct(query, keep=engine.rules.keywords), top_n=10, use_index=use_index)
+            latencies.append((time.perf_counter() - start) * 1000)
+    run_seconds = time.perf_counter() - run_start
+    latencies.sort()
+    memory = catalog.memory_report(ngram_index)
+
+    return {
+        "products": size,
+        "profile": profile,
+        "use_index": use_index,
+        "build_seconds": {
+            "generate": round(generate_seconds, 3),
+            "catalog": round(catalog_seconds, 3),
+            "ngram_index": round(index_seconds, 3),
+            "spelling_index": round(spelling_seconds, 3),
+        },
+        "queries": len(latencies),
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50), 3),
+            "p95": round(_percentile(latencies, 95), 3),
+            "p99": round(_percentile(latencies, 99), 3),
+            "mean": round(sum(latencies) / len(latencies), 3),
+            "max": round(latencies[-1], 3),
+        },
+        "queries_per_second": round(len(latencies) / run_seconds, 2),
+        "bytes_per_product": round(memory["bytes_per_product"], 1),
+        "memory_bytes": {part: memory[part] for part in memory if part not in ("total", "bytes_per_product")},
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def run_suite(sizes=DEFAULT_SIZES, output=RESULTS_FILE, **kwargs):
+    """
+    run_size() for each size in a fresh process (so peak RSS is per size), then
+    append the run as one JSON line to `output`
+    """
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for size in sizes:
+        with context.Pool(1) as pool:
+            results.append(pool.apply(run_size, (size,), kwargs))
+
+    run = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+    if output:
+        with open(output, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run) + "\n")
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark search latency and throughput on synthetic catalogs")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--profile", default="modular")
+    parser.add_argument("--rounds", type=int, default=3, help="passes over the query mix")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--index", action="store_true",
+                        help="narrow queries with the trigram index (may miss results a full scan ranks)")
+    parser.add_argument("--output", default=RESULTS_FILE, help="JSON lines file the run is appended to")
+    args = parser.parse_args()
+
+    run = run_suite(args.sizes, args.output, profile=args.profile, rounds=args.rounds,
+                    seed=args.seed, use_index=args.index)
+
+    print(f"{'products':>10} {'build s':>8} {'index s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'q/s':>8} {'RSS MB':>8} {'B/prod':>8}")
+    for r in run["results"]:
+        print(f"{r['products']:>10} {r['build_seconds']['catalog']:>8.2f} "
+              f"{r['build_seconds']['ngram_index']:>8.2f} {r['latency_ms']['p50']:>8.2f} "
+              f"{r['latency_ms']['p95']:>8.2f} {r['latency_ms']['p99']:>8.2f} "
+              f"{r['queries_per_second']:>8.1f} {r['peak_rss_mb']:>8.1f} {r['bytes_per_product']:>8.0f}")
+    print(f"💾 Appended to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
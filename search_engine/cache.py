@@ -0,0 +1,85 @@
+"""
+Search result cache
+LRU + TTL cache in front of search(), dropped automatically when the catalog
+or any scoring config changes.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+def config_fingerprint(*configs):
+    """Cheap fingerprint of scoring config dicts; changes whenever their contents do"""
+    return hash(repr(configs))
+
+
+class SearchCache:
+    """Results keyed on the normalized query, with size- and TTL-based LRU eviction"""
+
+    def __init__(self, maxsize=1024, ttl=600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()  # key -> (expires_at, top_n, results)
+        self._lock = threading.Lock()
+
+    def _check_version(self, version):
+        if version != self.version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.version = version
+
+    def get(self, key, top_n, version):
+        """
+        Cached results for key, or None.
+        Results cached for a larger top_n (or that ran out of matches) serve smaller requests.
+        """
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, cached_top_n, results = entry
+                if expires_at < time.monotonic():
+                    del self._entries[key]
+                    self.expirations += 1
+                elif cached_top_n >= top_n or len(results) < cached_top_n:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return results.head(top_n)
+            self.misses += 1
+            return None
+
+    def put(self, key, top_n, results, version):
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > top_n and len(entry[2]) >= top_n:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, top_n, results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
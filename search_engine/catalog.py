@@ -0,0 +1,302 @@
+"""
+Preprocessed in-memory catalog
+All query-independent normalization is done once here instead of inside every
+score_product() call. Only the columns search uses are kept, and text that is
+not read on every query (descriptions, display names) is packed into one
+buffer per column instead of one Python string per product.
+"""
+
+import itertools
+import sys
+
+import numpy as np
+import pandas as pd
+
+from .cache import config_fingerprint
+from .token_index import TokenIndex
+
+# Every catalog (and every change to one) gets a new version, so cached results never go stale
+_versions = itertools.count(1)
+
+# Length of the description summaries used by summary description scoring
+DESCRIPTION_SUMMARY_CHARS = 160
+
+# Columns of products_with_inferred_categories.csv the search process needs
+SEARCH_COLUMNS = ['id', 'name', 'description', 'category_final']
+
+# Source CSVs, as written by the inference and boost-fixing scripts
+PRODUCTS_CSV = "products_with_inferred_categories.csv"
+BOOSTS_CSV = "category_boost_fixed.csv"
+
+
+def read_products(path):
+    """The search columns of a products CSV (specifications, prices etc. are never loaded)"""
+    return pd.read_csv(path, usecols=lambda column: column in SEARCH_COLUMNS,
+                       dtype={'category_final': 'category'})
+
+
+def load_boost_dict(path):
+    """category -> boost from category_boost_fixed.csv, keyed on lowercased category"""
+    boost_dict = pd.read_csv(path).set_index('category')['boost'].to_dict()
+    return {k.lower(): v for k, v in boost_dict.items()}
+
+
+def summarize_description(description, max_chars=DESCRIPTION_SUMMARY_CHARS):
+    """Whitespace-normalized description cut to max_chars at a word boundary"""
+    text = " ".join(description.split())
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    return cut.rsplit(" ", 1)[0] if " " in cut else cut
+
+
+def clamp_boost(boost):
+    """Category boosts are clamped to the 1.0 - 3.0 range"""
+    return max(1.0, min(boost, 3.0))
+
+
+def _string_list_bytes(strings):
+    """Memory held by a list of str: the objects plus one pointer each"""
+    return sum(map(sys.getsizeof, strings)) + 8 * len(strings)
+
+
+class PackedStrings:
+    """
+    Strings stored back to back in one UTF-8 buffer with byte offsets, instead of
+    one Python object (~50 bytes of overhead) per string. Indexing decodes a copy.
+    """
+
+    def __init__(self, strings=()):
+        self.blob = bytearray()
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.extend(strings)
+
+    def extend(self, strings, chunk_size=65536):
+        """Append strings (any iterable), encoding a chunk at a time to bound peak memory"""
+        strings = iter(strings)
+        while True:
+            encoded = [s.encode("utf-8") for s in itertools.islice(strings, chunk_size)]
+            if not encoded:
+                break
+            lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+            self.blob += b"".join(encoded)
+            self.offsets = np.concatenate([self.offsets, self.offsets[-1] + np.cumsum(lengths)])
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].decode("utf-8")
+
+    def tolist(self):
+        offsets = self.offsets.tolist()
+        return [self.blob[start:end].decode("utf-8") for start, end in zip(offsets[:-1], offsets[1:])]
+
+    @property
+    def nbytes(self):
+        return len(self.blob) + self.offsets.nbytes
+
+
+class Catalog:
+    """Search-ready view of the products table, built once at load time"""
+
+    def __init__(self, products, boost_dict):
+        self.size = 0
+        self.labels = np.empty(0, dtype=np.int64)
+        self.display_names = PackedStrings()
+        self.name_missing = np.empty(0, dtype=bool)
+        self.display_category_values = []
+        self.display_category_codes = np.empty(0, dtype=np.int32)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.live = np.empty(0, dtype=bool)
+        self.deleted = 0
+        self._name_sort_keys = None
+        self.names = []
+        self.descriptions = PackedStrings()
+        self.has_description = np.empty(0, dtype=bool)
+        self.summaries = []
+        self.token_index = TokenIndex([])
+        self.category_values = []
+        self.category_codes = np.empty(0, dtype=np.int32)
+        self.partitions = None
+
+        self._append(products, products.index)
+        self.set_boosts(boost_dict)
+
+    @classmethod
+    def from_csv(cls, path, boost_dict):
+        return cls(read_products(path), boost_dict)
+
+    def _append(self, products, labels):
+        """Normalize `products` and add them as new rows, shown with the given index labels"""
+        count = len(products)
+
+        # Original name and category as search results display them (materialized for the top k only)
+        self.labels = np.concatenate([self.labels, np.asarray(labels)])
+        name_missing = products['name'].isna().to_numpy()
+        self.display_names.extend('' if missing else str(name)
+                                  for name, missing in zip(products['name'], name_missing))
+        self.name_missing = np.concatenate([self.name_missing, name_missing])
+        display_code_of = {cat: code for code, cat in enumerate(self.display_category_values)}
+        display_codes = []
+        for cat in products['category_final']:
+            cat = None if pd.isna(cat) else str(cat)
+            if cat not in display_code_of:
+                display_code_of[cat] = len(self.display_category_values)
+                self.display_category_values.append(cat)
+            display_codes.append(display_code_of[cat])
+        self.display_category_codes = np.concatenate(
+            [self.display_category_codes, np.asarray(display_codes, dtype=np.int32)]
+        )
+
+        # Product ids (for incremental sync); -1 when the table has no id column
+        ids = products['id'].to_numpy(dtype=np.int64) if 'id' in products.columns else np.full(count, -1)
+        self.ids = np.concatenate([self.ids, ids])
+        self.live = np.concatenate([self.live, np.ones(count, dtype=bool)])
+
+        # Normalized text (same normalization score_product() applies per row)
+        names = [str(name).lower() for name in products['name']]
+        if 'description' in products.columns:
+            raw_descriptions = products['description'].tolist()
+        else:
+            raw_descriptions = [None] * count
+        has_description = np.fromiter(
+            (pd.notna(desc) for desc in raw_descriptions), dtype=bool, count=count
+        )
+        self.names.extend(names)
+        self.descriptions.extend(
+            str(desc).lower() if present else ''
+            for desc, present in zip(raw_descriptions, has_description)
+        )
+        self.has_description = np.concatenate([self.has_description, has_description])
+
+        # Name tokens as a vocabulary with posting lists
+        self.token_index.add_rows(names)
+
+        # Categories as codes into the list of distinct lowercased categories
+        code_of = {cat: code for code, cat in enumerate(self.category_values)}
+        codes = []
+        for cat in products['category_final']:
+            cat = str(cat).lower()
+            if cat not in code_of:
+                code_of[cat] = len(self.category_values)
+                self.category_values.append(cat)
+            codes.append(code_of[cat])
+        self.category_codes = np.concatenate([self.category_codes, np.asarray(codes, dtype=np.int32)])
+
+        self.size += count
+        self.partitions = None
+        self._name_sort_keys = None
+
+    def apply_changes(self, changed, deleted_ids=(), ngram_index=None, spelling=None):
+        """
+        Apply inserted/updated products and deletions in place.
+        Old versions of updated products and deleted products are tombstoned (never
+        scored again); new versions are appended and indexed, including in `ngram_index`,
+        and their name and category tokens are added to the `spelling` dictionary.
+        Returns the appended row numbers.
+        """
+        row_of_id = {product_id: row for row, product_id in enumerate(self.ids.tolist()) if self.live[row]}
+        for product_id in list(deleted_ids) + changed['id'].tolist():
+            row = row_of_id.get(product_id)
+            if row is not None:
+                self.live[row] = False
+                self.deleted += 1
+
+        first_row = self.size
+        labels = pd.RangeIndex(first_row, first_row + len(changed))
+        self._append(changed, labels)
+        new_rows = range(first_row, self.size)
+        if ngram_index is not None:
+            ngram_index.add_rows(self, new_rows)
+        if spelling is not None:
+            spelling.add_rows(self, new_rows)
+
+        # New categories need boosts; also bumps the version so cached results are dropped
+        self.set_boosts(self.boost_dict)
+        return new_rows
+
+    def category_rows(self, codes):
+        """Sorted rows of the products in the given category codes (per-category partitions)"""
+        partitions = self.partitions
+        if partitions is None:
+            order = np.argsort(self.category_codes, kind='stable')
+            offsets = np.zeros(len(self.category_values) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.category_codes, minlength=len(self.category_values)), out=offsets[1:])
+            partitions = self.partitions = (order, offsets)
+        order, offsets = partitions
+        parts = [order[offsets[code]:offsets[code + 1]] for code in codes]
+        return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+    def description_summaries(self):
+        """Summaries of the normalized descriptions, built on first use (and for appended rows)"""
+        summaries = self.summaries
+        if len(summaries) < self.size:
+            # A new list rather than extend(): other threads may be reading the old one
+            summaries = summaries + [
+                summarize_description(self.descriptions[row]) for row in range(len(summaries), self.size)
+            ]
+            self.summaries = summaries
+        return summaries
+
+    @property
+    def name_sort_keys(self):
+        """
+        Per row, the rank of its name in ascending order with missing names last (as
+        sort_values does); results tie-break on it. Built on first use.
+        """
+        sort_keys = self._name_sort_keys
+        if sort_keys is None:
+            present = np.flatnonzero(~self.name_missing)
+            names = np.asarray(self.display_names.tolist(), dtype=object)
+            distinct, ranks = np.unique(names[present], return_inverse=True)
+            sort_keys = np.full(self.size, len(distinct), dtype=np.int32)
+            sort_keys[present] = ranks
+            # Published only once complete, for concurrent searches
+            self._name_sort_keys = sort_keys
+        return sort_keys
+
+    def display_rows(self, rows):
+        """Original name and category_final of catalog `rows`, indexed by their original labels"""
+        names = [None if self.name_missing[row] else self.display_names[row] for row in rows]
+        categories = [self.display_category_values[code] for code in self.display_category_codes[rows]]
+        return pd.DataFrame({'name': names, 'category_final': categories}, index=self.labels[rows])
+
+    def memory_report(self, ngram_index=None):
+        """Approximate bytes held by each part of the catalog (and the trigram index), plus per product"""
+        token_index = self.token_index
+        report = {
+            "names": _string_list_bytes(self.names),
+            "descriptions": self.descriptions.nbytes + self.has_description.nbytes,
+            "summaries": _string_list_bytes(self.summaries),
+            "display": (self.display_names.nbytes + self.name_missing.nbytes + self.labels.nbytes
+                        + self.display_category_codes.nbytes
+                        + _string_list_bytes([c for c in self.display_category_values if c is not None])),
+            "categories": (self.category_codes.nbytes + self.boosts.nbytes
+                           + _string_list_bytes(self.category_values)),
+            "ids": self.ids.nbytes + self.live.nbytes,
+            "token_index": (token_index.rows.nbytes + token_index.offsets.nbytes
+                            + _string_list_bytes(token_index.vocabulary) + sys.getsizeof(token_index.token_ids)),
+            "name_sort_keys": self._name_sort_keys.nbytes if self._name_sort_keys is not None else 0,
+        }
+        if ngram_index is not None:
+            report["ngram_index"] = ngram_index.nbytes
+        report["total"] = sum(report.values())
+        report["bytes_per_product"] = report["total"] / self.size if self.size else 0.0
+        return report
+
+    def set_boosts(self, boost_dict):
+        """Resolve (and clamp) the category boost for every product"""
+        self.category_boosts = np.asarray(
+            [clamp_boost(boost_dict.get(cat, 1.0)) for cat in self.category_values],
+            dtype=np.float64
+        )
+        self.boosts = self.category_boosts[self.category_codes]
+        self.boost_dict = boost_dict
+        self.boost_fingerprint = config_fingerprint(boost_dict)
+        self.version = next(_versions)
+
+    def sync_boosts(self, boost_dict):
+        """Re-resolve boosts if boost_dict was edited since they were last resolved"""
+        if config_fingerprint(boost_dict) != self.boost_fingerprint:
+            self.set_boosts(boost_dict)
@@ -0,0 +1,121 @@
+"""
+Keyword-based category inference
+Shared by 2_infer_categories.py and the incremental catalog sync.
+"""
+
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Define keyword → category mapping (first match wins)
+category_map = {
+    r"\biphone|apple\b": "iPhones",
+    r"\bsamsung|infinix|tecno|xiaomi|itel|oppo|android\b": "Android Phones",
+    r"\blaptop|macbook|hp|dell|lenovo|notebook|ultrabook\b": "Laptops & Ultrabooks",
+    r"\binverter|battery|ups|power supply\b": "Inverters",
+    r"\bperfume|fragrance|cologne|deodorant\b": "Perfumes",
+    r"\bshoe|sandal|sneaker|heel|flipflop\b": "Shoes",
+    r"\bbag|backpack|handbag|tote\b": "Bags",
+    r"\bskincare|serum|moisturizer|cleanser|toner|cream\b": "Skincare",
+    r"\btv|television|led\b": "Televisions",
+    r"\bblender|toaster|microwave|kettle|appliance\b": "Small Kitchen Appliances",
+    r"\bjean|shirt|dress|trouser|fashion|top|clothing\b": "Fashion",
+    r"\bbaby|kid|children\b": "Baby & Kids",
+    r"\bfitness|gym|dumbbell|treadmill|exercise|workout\b": "Sport & Fitness",
+    r"\bshampoo|conditioner|hair\b": "Haircare",
+    r"\bwatch|smartwatch\b": "Wearables",
+    r"\bspeaker|earbud|soundbar|headphone\b": "Audio & Wearables"
+}
+
+
+def _literal_alternatives(pattern):
+    """
+    Split an `a|b|c` keyword pattern into (literal, has_word_boundary) pairs,
+    or None if any alternative is more than a literal with optional \\b anchors.
+    """
+    alternatives = []
+    for alternative in pattern.split("|"):
+        literal = alternative.replace(r"\b", "")
+        if not literal or re.escape(literal) != literal:
+            return None
+        alternatives.append((literal, literal != alternative))
+    return alternatives
+
+
+class CategoryMatcher:
+    """
+    category_map compiled once. Each pattern is first checked with plain substring
+    tests on its keywords (C-speed `in`); the regex only runs to confirm \\b anchors.
+    Patterns are still tried in order, so the first matching category wins as before.
+    """
+
+    def __init__(self, category_map):
+        self.plans = []
+        for pattern, category in category_map.items():
+            alternatives = _literal_alternatives(pattern)
+            if alternatives is None:
+                plain, anchored = (), None  # regex only
+            else:
+                plain = tuple(lit for lit, bounded in alternatives if not bounded)
+                anchored = tuple(lit for lit, bounded in alternatives if bounded)
+            self.plans.append((re.compile(pattern), plain, anchored, category))
+
+    def infer(self, text):
+        """Category for already-combined product text, or None"""
+        text = text.lower()
+        for regex, plain, anchored, category in self.plans:
+            if anchored is None:
+                if regex.search(text):
+                    return category
+                continue
+            for literal in plain:
+                if literal in text:
+                    return category
+            for literal in anchored:
+                if literal in text:
+                    # A keyword is present; the regex decides whether its \b holds
+                    if regex.search(text):
+                        return category
+                    break
+        return None
+
+    def infer_many(self, texts, workers=None):
+        """infer() over a list of texts, optionally split across a process pool"""
+        if not workers or workers <= 1 or len(texts) < 10_000:
+            return [self.infer(text) for text in texts]
+        chunks = [list(chunk) for chunk in np.array_split(np.asarray(texts, dtype=object), workers * 4)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(self.infer_many, chunks)
+            return [category for chunk in results for category in chunk]
+
+
+_matcher = CategoryMatcher(category_map)
+
+
+# Function to infer category
+def infer_category(text):
+    if pd.isna(text):
+        return None
+    return _matcher.infer(text)
+
+
+def add_inferred_categories(df, workers=None):
+    """
+    Fill inferred_category for rows missing category_name, and category_final for all rows.
+    workers > 1 spreads the inference over a process pool (worth it on multi-million-row exports).
+    """
+    missing_mask = df["category_name"].isna()
+    texts = (
+        df.loc[missing_mask, "name"].fillna("") + " " +
+        df.loc[missing_mask, "description"].fillna("")
+    )
+    df.loc[missing_mask, "inferred_category"] = pd.Series(
+        _matcher.infer_many(texts.tolist(), workers), index=texts.index
+    )
+
+    df["category_final"] = df["category_name"]
+    df.loc[df["category_final"].isna(), "category_final"] = df["inferred_category"]
+    df["category_final"] = df["category_final"].fillna("Unknown")
+    return df
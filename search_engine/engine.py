@@ -0,0 +1,114 @@
+"""
+Search engine facade
+A catalog, a compiled rules profile and (optionally) the trigram index behind one
+search() call. The test scripts in the project root are thin profiles over this:
+
+    engine = SearchEngine.from_csv(profile="finetuned")
+    engine.search("iphone", top_n=10)
+"""
+
+import numpy as np
+
+from .catalog import BOOSTS_CSV, PRODUCTS_CSV, Catalog, load_boost_dict, read_products
+from .ngram_index import NgramIndex
+from .ranking import top_k
+from .rules import compile_rules
+from .scoring import score_catalog
+
+
+class SearchEngine:
+    """
+    Scores and ranks a catalog under one rules profile.
+    The catalog and indexes are only read while searching (scores live in per-query
+    arrays and only the top rows are materialized), so any number of threads can call
+    search() at once without locks or copies.
+    """
+
+    def __init__(self, catalog, rules, ngram_index=None, max_candidates=None):
+        self.catalog = catalog
+        self.rules = rules
+        self.ngram_index = ngram_index
+        self.max_candidates = max_candidates
+
+    @classmethod
+    def from_products(cls, products, profile="modular", boost_dict=None, index=False, **overrides):
+        """Engine over a products DataFrame (boost_dict defaults to none; profiles may carry their own)"""
+        catalog = Catalog(products, boost_dict or {})
+        ngram_index = NgramIndex(catalog) if index else None
+        return cls(catalog, compile_rules(profile, **overrides), ngram_index)
+
+    @classmethod
+    def from_csv(cls, products_csv=PRODUCTS_CSV, boosts_csv=BOOSTS_CSV, profile="modular", index=False,
+                 **overrides):
+        return cls.from_products(
+            read_products(products_csv), profile, load_boost_dict(boosts_csv), index, **overrides
+        )
+
+    def score(self, query, rows=None, stats=None, summarize_descriptions=False, trace=None):
+        """Scores for catalog `rows` (all if None); see score_catalog()"""
+        return score_catalog(self.catalog, query, self.rules, rows=rows, stats=stats,
+                             summarize_descriptions=summarize_descriptions, trace=trace)
+
+    def _top_rows(self, query, top_n, use_index, summarize_descriptions, trace=None, token_table=None):
+        """(rows, scores) of the top_n results"""
+        rows = None
+        if use_index and self.ngram_index is not None:
+            rows = self.ngram_index.candidates(query, self.max_candidates)
+        if trace is not None:
+            trace.lap("candidates")
+        # Without candidates, scoring plans the scan over the feasible category partitions itself
+        scores = score_catalog(self.catalog, query, self.rules, rows=rows,
+                               summarize_descriptions=summarize_descriptions, trace=trace,
+                               token_table=token_table)
+        if rows is None:
+            rows = np.arange(self.catalog.size)
+        return top_k(rows, scores, self.rules.sort_keys(self.catalog), top_n)
+
+    def search(self, query, top_n=10, use_index=False, summarize_descriptions=False, trace=None):
+        """
+        Top results as a DataFrame with name, category_final and score.
+        The whole catalog is scanned unless use_index=True; the trigram index is faster
+        but can miss results a full scan ranks (see ngram_index.measure_recall).
+        Pass a QueryTrace (trace.py) as `trace` to record per-stage timings and eliminations.
+        """
+        best_rows, best_scores = self._top_rows(query, top_n, use_index, summarize_descriptions, trace)
+        # Only the top_n winners are materialized
+        results = self.catalog.display_rows(best_rows).assign(score=best_scores)
+        if trace is not None:
+            trace.lap("rank")
+        return results
+
+    def search_many(self, queries, top_n=10, use_index=False, summarize_descriptions=False):
+        """
+        search() for each query, in order, sharing the work the queries have in common:
+        each distinct (lowercased) query is searched once, every distinct query token is
+        fuzzy-matched against the name vocabulary in a single pass, and the winners of
+        all queries are materialized together.
+        """
+        queries = list(queries)
+        if not queries:
+            return []
+        distinct = list(dict.fromkeys(query.lower() for query in queries))
+
+        token_table = None
+        if any(self.rules.needs_token_matches(query.split()) for query in distinct):
+            token_table = self.catalog.token_index.match_table(
+                [token for query in distinct for token in query.split()]
+            )
+
+        tops = [
+            self._top_rows(query, top_n, use_index, summarize_descriptions, token_table=token_table)
+            for query in distinct
+        ]
+        offsets = np.cumsum([0] + [len(best_rows) for best_rows, _ in tops])
+        results = self.catalog.display_rows(np.concatenate([best_rows for best_rows, _ in tops])).assign(
+            score=np.concatenate([best_scores for _, best_scores in tops])
+        )
+        by_query = {
+            # An empty slice would keep the batch's column dtypes; build it the way search() does
+            query: results.iloc[start:end] if end > start
+            else self.catalog.display_rows(best_rows).assign(score=best_scores)
+            for query, (best_rows, best_scores), start, end
+            in zip(distinct, tops, offsets[:-1].tolist(), offsets[1:].tolist())
+        }
+        return [by_query[query.lower()] for query in queries]
@@ -0,0 +1,196 @@
+"""
+Golden-result regression harness
+Records the top-k results (rows, names, categories, scores) and latency of a query
+set for the current catalog, then checks later runs against that recording:
+ranking diffs (added / dropped / reordered rows, score deltas) and queries that
+blew their latency budget. Queries run in parallel through run_batch().
+
+    python -m search_engine.golden record    # writes golden_results.json
+    python -m search_engine.golden check     # exit status 1 on any regression
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from .batch import load_search_fn, run_batch
+from .bench import query_mix
+from .catalog import BOOSTS_CSV, PRODUCTS_CSV
+from .snapshot import file_checksum
+
+GOLDEN_FILE = "golden_results.json"
+DEFAULT_SEARCH = "modular_testing:uncached_search"
+
+# A query is slow when it takes more than LATENCY_SLACK x its recorded latency
+# and more than LATENCY_MARGIN_MS over it (small timings are mostly noise)
+LATENCY_SLACK = 2.0
+LATENCY_MARGIN_MS = 5.0
+SCORE_TOLERANCE = 1e-6
+
+
+def catalog_fingerprint(products_csv=PRODUCTS_CSV, boosts_csv=BOOSTS_CSV):
+    """Checksums of the source CSVs the goldens are pinned to (None for a missing file)"""
+    return {
+        "products": file_checksum(products_csv) if os.path.exists(products_csv) else None,
+        "boosts": file_checksum(boosts_csv) if os.path.exists(boosts_csv) else None,
+    }
+
+
+def _top_results(results):
+    return [
+        {"row": int(label), "name": str(name), "category": str(category), "score": float(score)}
+        for label, name, category, score in zip(
+            results.index, results['name'], results['category_final'], results['score']
+        )
+    ]
+
+
+def run_queries(search_fn, queries, top_n=10, workers=None, repeats=3):
+    """
+    {query: {"results", "latency_ms"}}; latency is the best of `repeats` batch runs,
+    so one noisy run does not flag a regression
+    """
+    queries = list(dict.fromkeys(queries))
+    runs = {}
+    for _ in range(repeats):
+        rows, _ = run_batch(search_fn, queries, top_n, workers)
+        for row in rows:
+            latency = row["seconds"] * 1000
+            if row["query"] in runs:
+                runs[row["query"]]["latency_ms"] = min(runs[row["query"]]["latency_ms"], latency)
+            else:
+                runs[row["query"]] = {"results": _top_results(row["results"]), "latency_ms": latency}
+    return runs
+
+
+def record_golden(search_fn, queries, path=GOLDEN_FILE, top_n=10, workers=None, repeats=3):
+    """Run `queries` and write their results and latencies to `path`"""
+    golden = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "top_n": top_n,
+        "catalog": catalog_fingerprint(),
+        "queries": run_queries(search_fn, queries, top_n, workers, repeats),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(golden, f, indent=2)
+    return golden
+
+
+def diff_results(expected, found, tolerance=SCORE_TOLERANCE):
+    """Ranking diff of two _top_results() lists, keyed on catalog row"""
+    expected_rank = {r["row"]: i for i, r in enumerate(expected)}
+    found_rank = {r["row"]: i for i, r in enumerate(found)}
+    expected_score = {r["row"]: r["score"] for r in expected}
+    names = {r["row"]: r["name"] for r in expected + found}
+
+    common = [r["row"] for r in expected if r["row"] in found_rank]
+    return {
+        "added": [names[r["row"]] for r in found if r["row"] not in expected_rank],
+        "dropped": [names[r["row"]] for r in expected if r["row"] not in found_rank],
+        "reordered": [
+            {"name": names[row], "from": expected_rank[row] + 1, "to": found_rank[row] + 1}
+            for row in common if expected_rank[row] != found_rank[row]
+        ],
+        "score_deltas": [
+            {"name": names[r["row"]], "from": expected_score[r["row"]], "to": r["score"]}
+            for r in found
+            if r["row"] in expected_score and abs(r["score"] - expected_score[r["row"]]) > tolerance
+        ],
+    }
+
+
+def check_golden(search_fn, path=GOLDEN_FILE, queries=None, workers=None, repeats=3):
+    """
+    Re-run the recorded queries (or `queries`) and compare them with the goldens in `path`.
+    Returns a report with one entry per query and `passed` = no ranking or latency regression.
+    """
+    with open(path, encoding="utf-8") as f:
+        golden = json.load(f)
+    queries = list(dict.fromkeys(queries or golden["queries"]))
+    runs = run_queries(search_fn, queries, golden["top_n"], workers, repeats)
+
+    entries = []
+    for query in queries:
+        run = runs[query]
+        expected = golden["queries"].get(query)
+        if expected is None:
+            entries.append({"query": query, "status": "new", "latency_ms": run["latency_ms"]})
+            continue
+        diff = diff_results(expected["results"], run["results"])
+        budget = max(expected["latency_ms"] * LATENCY_SLACK, expected["latency_ms"] + LATENCY_MARGIN_MS)
+        changed = any(diff.values())
+        slow = run["latency_ms"] > budget
+        entries.append({
+            "query": query,
+            "status": "changed" if changed else "slow" if slow else "ok",
+            "slow": slow,
+            "latency_ms": run["latency_ms"],
+            "golden_latency_ms": expected["latency_ms"],
+            "budget_ms": budget,
+            **diff,
+        })
+
+    catalog_changed = golden["catalog"] != catalog_fingerprint()
+    return {
+        "catalog_changed": catalog_changed,
+        "queries": entries,
+        "passed": not catalog_changed and all(e["status"] in ("ok", "new") for e in entries),
+    }
+
+
+def print_report(report):
+    if report["catalog_changed"]:
+        print("⚠️ The catalog CSVs changed since the goldens were recorded; re-record them")
+    for entry in report["queries"]:
+        if entry["status"] == "new":
+            print(f"🆕 '{entry['query']}' has no golden ({entry['latency_ms']:.1f}ms)")
+            continue
+        timing = (f"{entry['latency_ms']:.1f}ms (golden {entry['golden_latency_ms']:.1f}ms, "
+                  f"budget {entry['budget_ms']:.1f}ms)")
+        icon = "✅" if entry["status"] == "ok" else "❌"
+        print(f"{icon} '{entry['query']}' {timing}{'  ⏱️ SLOW' if entry['slow'] else ''}")
+        for name in entry["added"]:
+            print(f"     + {name}")
+        for name in entry["dropped"]:
+            print(f"     - {name}")
+        for move in entry["reordered"]:
+            print(f"     ↕ {move['name']}: #{move['from']} → #{move['to']}")
+        for delta in entry["score_deltas"]:
+            print(f"     Δ {delta['name']}: {delta['from']:.4f} → {delta['to']:.4f}")
+    failed = sum(e["status"] not in ("ok", "new") for e in report["queries"])
+    print(f"\n📊 {len(report['queries']) - failed}/{len(report['queries'])} queries match their goldens")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or check golden search results")
+    parser.add_argument("action", choices=["record", "check"])
+    parser.add_argument("--search", default=DEFAULT_SEARCH, help="module:function to call")
+    parser.add_argument("--queries", help="file with one query per line (default: the benchmark query mix "
+                                          "for record, the recorded queries for check)")
+    parser.add_argument("--golden", default=GOLDEN_FILE)
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--repeats", type=int, default=3, help="runs per query; the fastest counts")
+    args = parser.parse_args()
+
+    queries = None
+    if args.queries:
+        with open(args.queries, encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+    search_fn = load_search_fn(args.search)
+
+    if args.action == "record":
+        golden = record_golden(search_fn, queries or query_mix(), args.golden, args.top_n,
+                               args.workers, args.repeats)
+        print(f"✅ Recorded goldens for {len(golden['queries'])} queries in {args.golden}")
+        return
+
+    report = check_golden(search_fn, args.golden, queries, args.workers, args.repeats)
+    print_report(report)
+    sys.exit(0 if report["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Character trigram inverted index
+Narrows a query down to the products that share at least one trigram with it,
+so only those go through the RapidFuzz scoring stages.
+"""
+
+import sys
+from collections import defaultdict
+
+import numpy as np
+
+NGRAM_SIZE = 3
+
+
+def trigrams(text):
+    """Set of character trigrams in an already-lowercased string"""
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class NgramIndex:
+    """Trigram -> product rows, over normalized names (and optionally descriptions)"""
+
+    def __init__(self, catalog, include_descriptions=False):
+        self.size = 0
+        self.include_descriptions = include_descriptions
+        self.postings = {}
+        self.add_rows(catalog, range(catalog.size))
+
+    def add_rows(self, catalog, rows):
+        """Index catalog `rows` (newly appended, in increasing order)"""
+        new_postings = defaultdict(list)
+        for row in rows:
+            grams = trigrams(catalog.names[row])
+            if self.include_descriptions:
+                grams |= trigrams(catalog.descriptions[row])
+            for gram in grams:
+                new_postings[gram].append(row)
+
+        for gram, new_rows in new_postings.items():
+            new_rows = np.asarray(new_rows, dtype=np.int32)
+            old_rows = self.postings.get(gram)
+            self.postings[gram] = new_rows if old_rows is None else np.concatenate([old_rows, new_rows])
+        self.size = catalog.size
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the postings (dict, trigram keys, arrays)"""
+        array_overhead = sys.getsizeof(np.empty(0, dtype=np.int32))
+        return sys.getsizeof(self.postings) + sum(
+            sys.getsizeof(gram) + array_overhead + rows.nbytes for gram, rows in self.postings.items()
+        )
+
+    def candidates(self, query, max_candidates=None):
+        """
+        Rows sharing at least one trigram with the query, in catalog order.
+        Returns None (caller should scan everything) when that would cut rows that
+        might rank: the query is too short to index, shares no trigram with any
+        name, or more than max_candidates rows share one.
+        Fuzzy scores do not need a shared trigram, so even these rows can miss a
+        result a full scan ranks (check with measure_recall()).
+        """
+        grams = trigrams(query.lower())
+        if not grams:
+            return None
+
+        lists = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not lists:
+            return None
+
+        rows = np.flatnonzero(np.bincount(np.concatenate(lists), minlength=self.size))
+        if max_candidates is not None and len(rows) > max_candidates:
+            return None
+        return rows
+
+
+def measure_recall(index, queries, search_fn, top_n=10, max_candidates=None):
+    """
+    Compare indexed search with a brute-force scan for each query.
+    search_fn(query, top_n, use_index=...) must return the ranked results DataFrame.
+    Recall is the share of the brute-force top_n results that indexed search also returned.
+    """
+    report = []
+    for query in queries:
+        expected = list(search_fn(query, top_n, use_index=False).index)
+        found = list(search_fn(query, top_n, use_index=True).index)
+        kept = len(set(expected) & set(found))
+
+        rows = index.candidates(query, max_candidates)
+        scanned = index.size if rows is None else len(rows)
+
+        report.append({
+            "query": query,
+            "expected": len(expected),
+            "found": kept,
+            "dropped": len(expected) - kept,
+            "recall": 1.0 if not expected else kept / len(expected),
+            "same_order": expected == found,
+            "full_scan": rows is None,
+            "scanned_pct": scanned / index.size * 100 if index.size else 0.0,
+        })
+    return report
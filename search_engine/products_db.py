@@ -0,0 +1,157 @@
+"""
+Products database access
+The products export query and the cleaning steps from explore_products.py,
+usable against MySQL/Postgres through SQLAlchemy or a local sqlite3 connection.
+export_products() streams the table to CSV in chunks, so memory stays bounded
+by the chunk size rather than the table size:
+
+    python -m search_engine.products_db --output products_clean.csv --max-memory-mb 256
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+# Full products dataset with category names
+PRODUCTS_QUERY = """
+SELECT
+    p.id,
+    p.name,
+    p.description,
+    p.category_id,
+    c.name AS category_name,
+    p.brand_id,
+    p.specifications,
+    p.status,
+    p.price{extra_columns}
+FROM products p
+LEFT JOIN categories c
+ON p.category_id = c.id{where}
+"""
+
+
+def products_query(extra_columns=(), where=""):
+    extra = "".join(f",\n    p.{column}" for column in extra_columns)
+    return PRODUCTS_QUERY.format(extra_columns=extra, where=f"\nWHERE {where}" if where else "")
+
+
+def database_url():
+    """Connection URL from DB_URL, or from the DB_* variables explore_products.py uses"""
+    if os.getenv("DB_URL"):
+        return os.getenv("DB_URL")
+    return (
+        f"postgresql+psycopg2://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
+        f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('DB_NAME')}"
+    )
+
+
+def connect(url=None):
+    """sqlite:///path opens a plain sqlite3 connection; anything else a SQLAlchemy engine"""
+    url = url or database_url()
+    if url.startswith("sqlite:///"):
+        return sqlite3.connect(url[len("sqlite:///"):])
+    from sqlalchemy import create_engine
+    return create_engine(url)
+
+
+def read_sql(sql, con, params=None, **kwargs):
+    """pd.read_sql_query with :name parameters on both sqlite3 and SQLAlchemy connections"""
+    if not isinstance(con, sqlite3.Connection):
+        from sqlalchemy import text
+        sql = text(sql)
+    return pd.read_sql_query(sql, con, params=params, **kwargs)
+
+
+def clean_products(df):
+    """Add the normalized category_name_clean, name_clean and description_clean columns"""
+    df['category_name_clean'] = (
+        df['category_name']
+        .fillna("unknown")  # handle missing categories
+        .str.lower()        # lowercase
+        .str.strip()        # remove leading/trailing whitespace
+        .str.replace(r'\s+', ' ', regex=True)           # normalize spaces
+        .str.replace(r'[^\w\s]', '', regex=True)       # remove special characters
+    )
+    df['name_clean'] = df['name'].fillna("").str.lower().str.strip()
+    df['description_clean'] = df['description'].fillna("").str.lower().str.strip()
+    return df
+
+
+def _open_cursor(con, sql, params=None):
+    """-> (column names, fetchmany(n), close) over a server-side cursor where the driver has one"""
+    if isinstance(con, sqlite3.Connection):
+        cursor = con.execute(sql, params or {})
+        return [d[0] for d in cursor.description], cursor.fetchmany, cursor.close
+    from sqlalchemy import text
+    connection = con.connect().execution_options(stream_results=True)
+    result = connection.execute(text(sql), params or {})
+    return list(result.keys()), result.fetchmany, connection.close
+
+
+def export_products(con, output_csv, sql=None, chunk_rows=50_000, max_memory_mb=None, on_chunk=None):
+    """
+    Stream the products query to output_csv, cleaning and appending one chunk at a time.
+    With max_memory_mb, the chunk size adapts (from a small first chunk) so a cleaned
+    chunk stays under that many MB. on_chunk(chunk) is called with each cleaned chunk.
+    Returns {rows, chunks, seconds, rows_per_second, peak_chunk_mb}.
+    """
+    if max_memory_mb:
+        chunk_rows = min(chunk_rows, 1000)
+    columns, fetchmany, close = _open_cursor(con, sql or products_query())
+    tmp_path = f"{output_csv}.tmp"
+    rows = chunks = peak_bytes = 0
+    start = time.perf_counter()
+    try:
+        while True:
+            records = fetchmany(chunk_rows)
+            if not records:
+                break
+            chunk = clean_products(pd.DataFrame.from_records(records, columns=columns))
+            chunk.to_csv(tmp_path, mode="a" if chunks else "w", header=not chunks, index=False)
+            if on_chunk is not None:
+                on_chunk(chunk)
+
+            chunk_bytes = chunk.memory_usage(deep=True).sum()
+            peak_bytes = max(peak_bytes, chunk_bytes)
+            rows += len(chunk)
+            chunks += 1
+            if max_memory_mb:
+                chunk_rows = max(1, int(max_memory_mb * 2**20 * len(chunk) / chunk_bytes))
+    finally:
+        close()
+
+    if not chunks:
+        clean_products(pd.DataFrame(columns=columns)).to_csv(tmp_path, index=False)
+    # Replace the previous export only once the new one is complete
+    os.replace(tmp_path, output_csv)
+
+    seconds = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "chunks": chunks,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(rows / seconds) if seconds else 0,
+        "peak_chunk_mb": round(peak_bytes / 2**20, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream the cleaned products table to CSV")
+    parser.add_argument("--db-url", default=None, help="defaults to DB_URL or the DB_* variables")
+    parser.add_argument("--output", default="products_clean.csv")
+    parser.add_argument("--chunk-rows", type=int, default=50_000)
+    parser.add_argument("--max-memory-mb", type=float, default=None)
+    args = parser.parse_args()
+
+    report = export_products(connect(args.db_url), args.output, chunk_rows=args.chunk_rows,
+                             max_memory_mb=args.max_memory_mb)
+    print(f"✅ Exported {report['rows']} products to {args.output} in {report['chunks']} chunks, "
+          f"{report['seconds']}s ({report['rows_per_second']} rows/s, "
+          f"largest chunk {report['peak_chunk_mb']} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Bounded top-k selection
+Picks the best k scored rows without sorting every product that scored above zero.
+"""
+
+import heapq
+
+import numpy as np
+
+
+def top_k(rows, scores, sort_keys, k):
+    """
+    The k best (row, score) pairs among scores > 0, in the same order as
+    sort_values(by=['score', 'name'], ascending=[False, True]) followed by head(k).
+    sort_keys[row] is the catalog's name sort key; ties keep catalog order.
+    With sort_keys=None, score ties are broken by catalog order alone.
+    Returns (rows, scores) arrays.
+    """
+    hits = np.flatnonzero(scores > 0)
+    k = max(k, 0)
+
+    if len(hits) > k:
+        # Only rows scoring at least the k-th best score can make the cut
+        kth = len(hits) - k
+        cutoff = np.partition(scores[hits], kth)[kth] if k else np.inf
+        hits = hits[scores[hits] >= cutoff]
+
+    if sort_keys is None:
+        key = lambda i: (-scores[i], rows[i])
+    else:
+        key = lambda i: (-scores[i], sort_keys[rows[i]], rows[i])
+    best = heapq.nsmallest(k, hits.tolist(), key=key)
+    best = np.asarray(best, dtype=np.int64)
+    return rows[best], scores[best]
@@ -0,0 +1,217 @@
+"""
+Scoring rules
+One declarative config for everything score_product() used to hard-code: weights,
+bonuses, gates, category filters, brand blocks and minimum thresholds. Each test
+script is a profile (a set of overrides of BASE_RULES). compile_rules() turns a
+profile into a Rules object with the lookups resolved once: brand blocks as one
+regex per query, and boosts, filter masks and thresholds as per-category arrays.
+Rules are read-only; to change them, compile new ones.
+"""
+
+import re
+from types import MappingProxyType
+
+import numpy as np
+
+from .cache import config_fingerprint
+from .catalog import clamp_boost
+
+BASE_RULES = {
+    # Base score = name_weight * partial_ratio(name) + description_weight * partial_ratio(description)
+    "name_weight": 0.85,
+    "description_weight": 0.15,
+    # Added in this order, each capped at 100
+    "exact_bonus": 15,        # query is a substring of the name
+    "token_bonus": 0,         # a query token has fuzz.ratio > 85 against a name token
+    "word_subset_bonus": 0,   # every query word is a name word
+    # Gates (None = off)
+    "multi_token_share": None,            # multi-word queries: share of tokens that must match a name token
+    "short_query_length": None,           # queries this short need name score >= short_query_min_name_score
+    "short_query_min_name_score": 75,
+    "noise_floor": None,                  # drop when name and description scores are both below it
+    "missing_description": None,          # text scored in place of a missing description (None = score 0)
+    "weak_match_score": None,             # drop when name score is below it, no token matches, and
+                                          # the query is one word or the description score is below it too
+    "high_boost": None,                   # categories boosted above this need name score >=
+    "high_boost_min_name_score": 70,      # high_boost_min_name_score or a token match
+    # Category boosts: None = the catalog's boost_dict (category_boost_fixed.csv)
+    "boosts": None,
+    # Query keyword -> allowed categories; other categories get boost *= category_penalty
+    "category_filters": {},
+    "category_penalty": 0.2,
+    # Exact query -> name substrings that exclude a product
+    "brand_blocks": {},
+    # Category -> minimum final score ('default' for the rest)
+    "min_score_thresholds": {"default": 0},
+    # Score ties: "name" (ascending, missing last) or "row" (catalog order)
+    "tie_break": "name",
+}
+
+PROFILES = {
+    # modular_testing.py
+    "modular": {
+        "token_bonus": 10,
+        "multi_token_share": 0.6,
+        "short_query_length": 4,
+        "category_filters": {
+            'fryer': ['microwaves', 'kitchen'],
+            'chair': ['chairs', 'furniture', 'office desks'],
+            'wig': ['wigs', 'hair', 'wigs and weaves'],
+            'jeans': ['fashion', 'trousers', 'jeans'],
+            'samba': ['female shoes', 'male shoes', 'sports shoes', 'shoes']
+        },
+        "brand_blocks": {
+            'samba': ['samsung', 'sam sung'],
+        },
+        "min_score_thresholds": {
+            'fashion': 80,
+            'electronics': 85,
+            'iphones': 60,
+            'phones & tablets': 70,
+            'default': 60
+        },
+    },
+    # 5_test_search_strict.py
+    "strict": {
+        "token_bonus": 10,
+        "multi_token_share": 0.6,
+        "short_query_length": 4,
+        "category_filters": {
+            'fryer': ['microwaves', 'kitchen'],
+            'chair': ['chairs', 'furniture', 'office desks'],
+            'wig': ['wigs', 'hair'],
+            'jeans': ['fashion', 'trousers', 'jeans'],
+            'samba': ['female shoes', 'male shoes', 'sports shoes']
+        },
+        "min_score_thresholds": {
+            'fashion': 80,
+            'electronics': 85,
+            'iphones': 60,
+            'phones & tablets': 70,
+            'default': 60
+        },
+    },
+    # 5_test_search_ranking_finetuned.py
+    "finetuned": {
+        "word_subset_bonus": 5,
+        "noise_floor": 20,
+    },
+    # 3_test_search_ranking.py
+    "ranking": {
+        "noise_floor": 20,
+        "tie_break": "row",
+    },
+    # test_search_validation.py
+    "validation": {
+        "token_bonus": 10,
+        "weak_match_score": 60,
+        "high_boost": 2.0,
+        "boosts": {
+            "iphones": 1.5,
+            "android phones": 1.5,
+            "mobile phones": 1.4,
+            "fashion": 1.2,
+            "electronics": 1.0,
+            "inverters": 1.1,
+            "refrigerators": 1.1,
+            "wigs and weaves": 1.3,
+            "furniture": 1.1,
+        },
+        # The script scored str(description), "nan" for a missing one
+        "missing_description": "nan",
+        "tie_break": "row",
+    },
+}
+
+
+def _frozen(value):
+    """Read-only copy of a config value: dicts as mapping proxies, lists as tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _frozen(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_frozen(item) for item in value)
+    return value
+
+
+class Rules:
+    """
+    A rules config compiled for fast lookups.
+    The config is frozen (a copy of it, read-only) so the compiled tables and the
+    fingerprint cached results are keyed on can never go stale.
+    """
+
+    def __init__(self, config):
+        config = _frozen(config)
+        self.config = config
+        for key, value in config.items():
+            setattr(self, key, value)
+        self.fingerprint = config_fingerprint(config)
+
+        # Brand blocks: one alternation regex of the blocked substrings per query
+        self.brand_patterns = {
+            query: re.compile("|".join(re.escape(term) for term in terms))
+            for query, terms in config["brand_blocks"].items() if terms
+        }
+        self.min_default = config["min_score_thresholds"].get("default", 0)
+        # Words of the category filter and brand block keys (typo correction leaves them alone)
+        self.keywords = tuple(sorted({
+            word for key in [*config["category_filters"], *config["brand_blocks"]] for word in key.split()
+        }))
+        # (catalog key, per-category arrays), resolved for one catalog version at a time and
+        # swapped as one object so concurrent searches never see a key with another's arrays
+        self._tables = (None, None)
+
+    def needs_token_matches(self, query_tokens):
+        return bool(
+            (self.multi_token_share is not None and len(query_tokens) > 1)
+            or self.token_bonus or self.weak_match_score is not None or self.high_boost is not None
+        )
+
+    def _catalog_tables(self, catalog):
+        """(clamped boost, minimum score, filter masks) per category code of `catalog`"""
+        key = (id(catalog), catalog.version, len(catalog.category_values))
+        tables_for, tables = self._tables
+        if tables_for != key:
+            if self.boosts is None:
+                boosts = catalog.category_boosts
+            else:
+                boosts = np.asarray(
+                    [clamp_boost(self.boosts.get(cat, 1.0)) for cat in catalog.category_values],
+                    dtype=np.float64
+                )
+            min_scores = np.asarray(
+                [self.min_score_thresholds.get(cat, self.min_default) for cat in catalog.category_values],
+                dtype=np.float64
+            )
+            allowed = [
+                (keyword, np.asarray(
+                    [any(a in cat for a in allowed_cats) for cat in catalog.category_values], dtype=bool
+                ))
+                for keyword, allowed_cats in self.category_filters.items()
+            ]
+            tables = (boosts, min_scores, allowed)
+            self._tables = (key, tables)
+        return tables
+
+    def category_tables(self, catalog, query):
+        """
+        Per category code: boost after cross-category penalties, minimum score, and the
+        clamped boost before penalties
+        """
+        boosts, min_scores, allowed = self._catalog_tables(catalog)
+        penalized = boosts
+        for keyword, allowed_mask in allowed:
+            if keyword in query:
+                penalized = np.where(allowed_mask, penalized, penalized * self.category_penalty)
+        return penalized, min_scores, boosts
+
+    def sort_keys(self, catalog):
+        return catalog.name_sort_keys if self.tie_break == "name" else None
+
+
+def compile_rules(profile="modular", **overrides):
+    """BASE_RULES + a profile (name or dict of overrides) + keyword overrides -> Rules"""
+    config = dict(BASE_RULES)
+    config.update(PROFILES[profile] if isinstance(profile, str) else profile)
+    config.update(overrides)
+    return Rules(config)
@@ -0,0 +1,303 @@
+"""
+Batched scoring engine
+Scores every product in a Catalog for a query in one pass instead of a per-row
+DataFrame.apply, under a compiled rules profile (rules.py).
+"""
+
+import time
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+from .ranking import top_k
+
+
+def _gate(counts, stage, alive, keep):
+    """Drop the positions failing a stage and record how many it eliminated"""
+    counts[stage] = counts.get(stage, 0) + int(len(alive) - keep.sum())
+    return alive[keep]
+
+
+def _lap(trace, stage):
+    if trace is not None:
+        trace.lap(stage)
+
+
+def _cutoff(needed):
+    """RapidFuzz score_cutoff just below the score a product needs (rounded down so fewer distinct cutoffs)"""
+    return np.maximum(np.floor(needed - 1e-6), 0)
+
+
+def _partial_ratios(query, texts, cutoffs):
+    """
+    fuzz.partial_ratio(query, text) for each text, with a per-text score_cutoff.
+    Texts are batched by cutoff; scores below their cutoff come back as 0.
+    """
+    scores = np.zeros(len(texts), dtype=np.float64)
+    for cutoff in np.unique(cutoffs):
+        if cutoff > 100:
+            continue
+        at = np.flatnonzero(cutoffs == cutoff)
+        scores[at] = process.cdist(
+            [query], [texts[i] for i in at], scorer=fuzz.partial_ratio,
+            dtype=np.float64, score_cutoff=cutoff, workers=-1
+        )[0]
+    return scores
+
+
+def _apply_bonuses(rules, base_score, exact, strong_token_match, word_subset):
+    """Bonuses in score_product() order, each capped at 100"""
+    for amount, applies in ((rules.exact_bonus, exact), (rules.token_bonus, strong_token_match),
+                            (rules.word_subset_bonus, word_subset)):
+        if amount:
+            base_score = np.where(applies, np.minimum(base_score + amount, 100), base_score)
+    return base_score
+
+
+def _required_scores(rules, query, name_score, strong_token_match, has_desc):
+    """
+    Description score each product needs to get past the noise floor and weak-match gates
+    given its exact name score (0 where they do not constrain the description)
+    """
+    required = np.zeros(len(name_score), dtype=np.float64)
+    if rules.noise_floor is not None:
+        required = np.where(name_score < rules.noise_floor, np.maximum(required, rules.noise_floor), required)
+    if rules.weak_match_score is not None and len(set(query.split())) > 1:
+        weak = (name_score < rules.weak_match_score) & ~strong_token_match
+        required = np.where(weak, np.maximum(required, rules.weak_match_score), required)
+    return np.where(has_desc, required, 0)
+
+
+def score_catalog(catalog, query, rules, rows=None, stats=None, summarize_descriptions=False, trace=None,
+                  token_table=None):
+    """
+    Score products in `catalog` against `query` under compiled `rules` (see rules.py).
+    Scores all products, or only `rows` (sorted row numbers) when given.
+    Returns a float array aligned with those rows; 0 means the product was filtered out.
+
+    Runs as a pipeline of gates, cheapest first. A product is dropped as soon as it
+    cannot reach its category's minimum score or pass a gate, and the fuzzy stages only
+    run with a score_cutoff derived from those, so results match the profile's original
+    score_product() exactly.
+    If `stats` is a dict, the number of products each stage eliminated is added to it.
+    A QueryTrace (trace.py) as `trace` also gets each stage's wall time.
+    `token_table` is a TokenIndex.match_table() shared by a batch of queries.
+
+    With summarize_descriptions, the description score is partial_ratio against a short
+    summary (Catalog.description_summaries()) instead of the full text, or 100 when the
+    query occurs in the full description. Cost per product is bounded, but scores can be
+    lower than score_product()'s; see measure_description_agreement().
+    """
+    full_scan = rows is None
+    if full_scan:
+        rows = np.arange(catalog.size)
+    query = query.lower()
+    query_tokens = query.split()
+
+    counts = {"scored": len(rows)}
+    final_score = np.zeros(len(rows), dtype=np.float64)
+
+    # Category boost & cross-category penalty: a category where even a perfect 100 cannot
+    # clear the minimum is never scanned. Full scans only visit the feasible partitions.
+    category_boost, category_min, category_raw_boost = rules.category_tables(catalog, query)
+    feasible = ~(100 * category_boost < category_min)
+    codes = catalog.category_codes[rows]
+    if full_scan and not feasible.all():
+        alive = catalog.category_rows(np.flatnonzero(feasible))  # positions == rows
+        counts["category_penalty"] = len(rows) - len(alive)
+    else:
+        alive = np.arange(len(rows))  # positions into rows still in the running
+        alive = _gate(counts, "category_penalty", alive, feasible[codes])
+    boost = category_boost[codes]
+    min_score = category_min[codes]
+    _lap(trace, "category_penalty")
+
+    # Products deleted or superseded by an incremental sync
+    if catalog.deleted:
+        alive = _gate(counts, "deleted", alive, catalog.live[rows[alive]])
+        _lap(trace, "deleted")
+
+    # Brand blocking
+    brand_pattern = rules.brand_patterns.get(query)
+    if brand_pattern is not None:
+        keep = np.fromiter(
+            (brand_pattern.search(catalog.names[row]) is None for row in rows[alive]),
+            dtype=bool, count=len(alive)
+        )
+        alive = _gate(counts, "brand_block", alive, keep)
+        _lap(trace, "brand_block")
+
+    # Multi-token filter (query tokens vs the name-token vocabulary, as bitsets)
+    if rules.needs_token_matches(query_tokens):
+        token_matches = catalog.token_index.token_matches(query_tokens, token_table)[:, rows[alive]]
+    else:
+        token_matches = np.zeros((len(query_tokens), len(alive)), dtype=bool)
+    if rules.multi_token_share is not None and len(query_tokens) > 1:
+        keep = ~(token_matches.sum(axis=0) < len(query_tokens) * rules.multi_token_share)
+        alive = _gate(counts, "multi_token", alive, keep)
+        token_matches = token_matches[:, keep]
+    _lap(trace, "multi_token")
+
+    # Bonuses are known before any fuzzy scoring, which bounds the best reachable score
+    names = [catalog.names[row] for row in rows[alive]]
+    exact = np.fromiter((query in name for name in names), dtype=bool, count=len(alive))
+    strong_token_match = token_matches.any(axis=0)
+    if rules.word_subset_bonus:
+        word_subset = catalog.token_index.exact_matches(set(query_tokens))[:, rows[alive]].all(axis=0)
+    else:
+        word_subset = np.zeros(len(alive), dtype=bool)
+    bonus = (rules.exact_bonus * exact + rules.token_bonus * strong_token_match
+             + rules.word_subset_bonus * word_subset)
+    has_desc = catalog.has_description[rows[alive]]
+    if rules.missing_description is not None:
+        has_desc = np.ones(len(alive), dtype=bool)
+    needed = min_score[alive] / boost[alive]
+    raw_boost = category_raw_boost[codes[alive]]
+    _lap(trace, "bonuses")
+
+    # Name score, only computed where it could still lead to a passing product
+    name_cutoff = _cutoff((needed - 100 * rules.description_weight * has_desc - bonus) / rules.name_weight)
+    if rules.noise_floor is not None:
+        # Without a description the name alone has to clear the noise floor
+        name_cutoff = np.where(has_desc, name_cutoff, np.maximum(name_cutoff, rules.noise_floor))
+    if rules.weak_match_score is not None:
+        # Unless a token matches, the name has to clear it (or the description, for multi-word queries)
+        weak = ~strong_token_match
+        if len(set(query_tokens)) > 1:
+            weak &= ~has_desc
+        name_cutoff = np.where(weak, np.maximum(name_cutoff, rules.weak_match_score), name_cutoff)
+    if rules.high_boost is not None:
+        high = (raw_boost > rules.high_boost) & ~strong_token_match
+        name_cutoff = np.where(high, np.maximum(name_cutoff, rules.high_boost_min_name_score), name_cutoff)
+    short_query = rules.short_query_length is not None and len(query) <= rules.short_query_length
+    if short_query:
+        # Short query strictness
+        short_binding = name_cutoff <= rules.short_query_min_name_score
+        name_cutoff = np.maximum(name_cutoff, rules.short_query_min_name_score)
+    name_score = _partial_ratios(query, names, name_cutoff)
+
+    keep = ~(name_score < name_cutoff)
+    if short_query:
+        counts["short_query"] = int((~keep & short_binding).sum())
+        counts["name_cutoff"] = int((~keep & ~short_binding).sum())
+    else:
+        counts["name_cutoff"] = int((~keep).sum())
+    alive, name_score, exact, strong_token_match, word_subset, bonus, has_desc, needed, raw_boost = (
+        alive[keep], name_score[keep], exact[keep], strong_token_match[keep], word_subset[keep],
+        bonus[keep], has_desc[keep], needed[keep], raw_boost[keep]
+    )
+    _lap(trace, "name_cutoff")
+
+    # Description score: skipped where the name alone already caps the base score at 100
+    # and no gate depends on it
+    desc_score = np.zeros(len(alive), dtype=np.float64)
+    required = _required_scores(rules, query, name_score, strong_token_match, has_desc)
+    capped = _apply_bonuses(rules, rules.name_weight * name_score, exact, strong_token_match, word_subset) >= 100
+    desc_at = np.flatnonzero(has_desc & ~(capped & (required == 0)))
+    desc_cutoff = np.maximum(
+        _cutoff((needed[desc_at] - rules.name_weight * name_score[desc_at] - bonus[desc_at])
+                / rules.description_weight),
+        required[desc_at]
+    )
+    desc_rows = rows[alive[desc_at]]
+    descriptions = [
+        catalog.descriptions[row] if catalog.has_description[row] else rules.missing_description
+        for row in desc_rows
+    ]
+    if summarize_descriptions:
+        summaries = catalog.description_summaries()
+        # A query inside the full description scores 100 either way; only the rest is approximated
+        in_full = np.fromiter(
+            (bool(query) and query in description for description in descriptions),
+            dtype=bool, count=len(desc_rows)
+        )
+        desc_score[desc_at[in_full]] = 100.0
+        rest = np.flatnonzero(~in_full)
+        desc_score[desc_at[rest]] = _partial_ratios(
+            query,
+            [summaries[row] if catalog.has_description[row] else descriptions[i]
+             for i, row in zip(rest.tolist(), desc_rows[rest].tolist())],
+            desc_cutoff[rest]
+        )
+    else:
+        desc_score[desc_at] = _partial_ratios(query, descriptions, desc_cutoff)
+    keep = np.ones(len(alive), dtype=bool)
+    keep[desc_at] = ~(desc_score[desc_at] < desc_cutoff)
+    counts["description_cutoff"] = int(len(keep) - keep.sum())
+    alive, name_score, desc_score, exact, strong_token_match, word_subset, raw_boost = (
+        alive[keep], name_score[keep], desc_score[keep], exact[keep], strong_token_match[keep],
+        word_subset[keep], raw_boost[keep]
+    )
+    _lap(trace, "description_cutoff")
+
+    # Base fuzzy scoring + bonuses, exactly as score_product() computes them
+    base_score = _apply_bonuses(
+        rules, rules.name_weight * name_score + rules.description_weight * desc_score,
+        exact, strong_token_match, word_subset
+    )
+    scores = base_score * boost[alive]
+
+    # Gates on the exact scores
+    keep = np.ones(len(alive), dtype=bool)
+    if rules.noise_floor is not None:
+        keep &= ~((name_score < rules.noise_floor) & (desc_score < rules.noise_floor))
+    if rules.weak_match_score is not None:
+        weak = (name_score < rules.weak_match_score) & ~strong_token_match
+        if len(set(query_tokens)) > 1:
+            weak &= desc_score < rules.weak_match_score
+        keep &= ~weak
+    if rules.high_boost is not None:
+        keep &= ~((raw_boost > rules.high_boost) & (name_score < rules.high_boost_min_name_score)
+                  & ~strong_token_match)
+    counts["score_gates"] = int(len(keep) - keep.sum())
+    alive, scores = alive[keep], scores[keep]
+    _lap(trace, "score_gates")
+
+    # Minimum score thresholds
+    keep = ~(scores < min_score[alive]) & (scores > 0)
+    final_score[alive[keep]] = scores[keep]
+    counts["min_threshold"] = int(len(keep) - keep.sum())
+    counts["passed"] = int(keep.sum())
+    _lap(trace, "min_threshold")
+
+    if stats is not None:
+        for stage, count in counts.items():
+            stats[stage] = stats.get(stage, 0) + count
+    if trace is not None:
+        trace.add_counts(counts)
+
+    return final_score
+
+
+def measure_description_agreement(catalog, queries, score_fn, top_n=10, repeats=3):
+    """
+    Compare summary description scoring with full-text scoring for each query.
+    score_fn(query, summarize_descriptions=...) must return scores for every catalog row.
+    Reports the best-of-`repeats` latency of both and how much of the full-text top_n
+    (and its order) the summary scoring reproduces.
+    """
+    report = []
+    for query in queries:
+        timings = {}
+        tops = {}
+        for summarize in (False, True):
+            best = float("inf")
+            for _ in range(repeats):
+                start = time.perf_counter()
+                scores = score_fn(query, summarize_descriptions=summarize)
+                best = min(best, time.perf_counter() - start)
+            timings[summarize] = best * 1000
+            positive = np.flatnonzero(scores > 0)
+            tops[summarize] = top_k(positive, scores[positive], catalog.name_sort_keys, top_n)[0].tolist()
+
+        expected, found = tops[False], tops[True]
+        kept = len(set(expected) & set(found))
+        report.append({
+            "query": query,
+            "full_ms": timings[False],
+            "summary_ms": timings[True],
+            "speedup": timings[False] / timings[True] if timings[True] else 0.0,
+            "agreement": 1.0 if not expected else kept / len(expected),
+            "same_order": expected == found,
+        })
+    return report
@@ -0,0 +1,180 @@
+"""
+Search HTTP service
+Long-running asyncio server that keeps the catalog warm in memory and answers
+GET /search?q=&top_n= concurrently. Scoring runs in an executor so the event
+loop stays responsive. Standard library only, so it runs on localhost as-is:
+
+    python -m search_engine.service --port 8080
+    curl "http://127.0.0.1:8080/search?q=iphone&top_n=5"
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from .batch import load_search_fn
+
+MAX_TOP_N = 100
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error"}
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+def results_to_json(results):
+    """Search results DataFrame -> list of JSON-safe dicts"""
+    rows = []
+    for name, category, score in results[['name', 'category_final', 'score']].itertuples(index=False):
+        rows.append({
+            "name": name if isinstance(name, str) else None,
+            "category_final": category if isinstance(category, str) else None,
+            "score": None if math.isnan(score) else float(score),
+        })
+    return rows
+
+
+class SearchService:
+    """Serves search_fn(query, top_n) over HTTP with latency metrics"""
+
+    def __init__(self, search_fn, executor=None, latency_window=10000):
+        self.search_fn = search_fn
+        self.executor = executor or ThreadPoolExecutor(max_workers=4)
+        self.started_at = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.latencies_ms = deque(maxlen=latency_window)
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=8080):
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.executor.shutdown(wait=False)
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            # Headers are read and ignored; requests never carry a body here
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            status, payload = await self._dispatch(request_line.decode("latin-1").split())
+        except Exception as exc:
+            status, payload = 500, {"error": str(exc)}
+
+        if status >= 500:
+            self.errors += 1
+        body = json.dumps(payload).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode("latin-1") + body
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _dispatch(self, parts):
+        if len(parts) < 2:
+            return 400, {"error": "malformed request"}
+        method, target = parts[0], parts[1]
+        if method != "GET":
+            return 405, {"error": "only GET is supported"}
+
+        url = urlsplit(target)
+        params = parse_qs(url.query)
+        if url.path == "/search":
+            return await self._search(params)
+        if url.path == "/health":
+            return 200, {"status": "ok", "uptime_seconds": round(time.time() - self.started_at, 1)}
+        if url.path == "/metrics":
+            return 200, self.metrics()
+        return 404, {"error": f"unknown path {url.path}"}
+
+    async def _search(self, params):
+        query = params.get("q", [""])[0].strip()
+        if not query:
+            return 400, {"error": "missing q"}
+        try:
+            top_n = int(params.get("top_n", ["10"])[0])
+        except ValueError:
+            return 400, {"error": "top_n must be an integer"}
+        top_n = max(1, min(top_n, MAX_TOP_N))
+
+        self.requests += 1
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(self.executor, self.search_fn, query, top_n)
+        finally:
+            self.in_flight -= 1
+        took_ms = (time.perf_counter() - start) * 1000
+        self.latencies_ms.append(took_ms)
+
+        return 200, {
+            "query": query,
+            "top_n": top_n,
+            "took_ms": round(took_ms, 2),
+            "results": results_to_json(results),
+        }
+
+    def metrics(self):
+        latencies = sorted(self.latencies_ms)
+        return {
+            "search_requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "latency_ms": {
+                "p50": round(_percentile(latencies, 50), 2),
+                "p95": round(_percentile(latencies, 95), 2),
+                "p99": round(_percentile(latencies, 99), 2),
+                "max": round(latencies[-1], 2) if latencies else 0.0,
+            },
+        }
+
+
+async def serve(search_fn, host="127.0.0.1", port=8080, threads=4):
+    service = SearchService(search_fn, ThreadPoolExecutor(max_workers=threads))
+    host, port = await service.start(host, port)
+    print(f"🔍 Search service listening on http://{host}:{port}")
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the search HTTP service")
+    parser.add_argument("--search", default="modular_testing:search", help="module:function to serve")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    # Importing the search module loads the catalog and boosts once, before serving
+    search_fn = load_search_fn(args.search)
+    try:
+        asyncio.run(serve(search_fn, args.host, args.port, args.threads))
+    except KeyboardInterrupt:
+        print("\n👋 Service stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Binary catalog snapshot
+Compiles the catalog, resolved boosts and the token/trigram indexes into a
+directory of .npy arrays plus a manifest, so search processes start without
+parsing CSVs. The manifest carries the size, mtime and checksum of the source
+CSVs; a snapshot built from an older CSV is reported as stale.
+
+    python -m search_engine.snapshot          # build catalog.snapshot/
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from .catalog import BOOSTS_CSV, PRODUCTS_CSV, Catalog, PackedStrings, load_boost_dict, read_products
+from .ngram_index import NgramIndex
+from .spelling import SpellingIndex
+from .token_index import TokenIndex
+
+SNAPSHOT_FORMAT = 6
+
+SNAPSHOT_DIR = "catalog.snapshot"
+SPELLING_FILE = "spelling.pkl"
+
+
+class StaleSnapshotError(Exception):
+    """The snapshot was built from different source CSVs (or an older format)"""
+
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_stamp(path):
+    """Size, mtime and checksum of a source CSV, as recorded in the manifest"""
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "checksum": file_checksum(path)}
+
+
+def source_changed(path, stamp):
+    """
+    Whether `path` differs from its manifest stamp. The file is only hashed when its
+    size or mtime moved, so an untouched CSV costs one stat() per startup.
+    """
+    stat = os.stat(path)
+    if stat.st_size != stamp["size"]:
+        return True
+    if stat.st_mtime_ns == stamp["mtime_ns"]:
+        return False
+    # Touched (copied, checked out again...) but possibly the same content
+    return file_checksum(path) != stamp["checksum"]
+
+
+def pack_strings(strings):
+    """Strings -> (UTF-8 bytes of them all joined, character offsets); None is stored as ''"""
+    text = "".join(s or "" for s in strings)
+    offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+    np.cumsum([len(s or "") for s in strings], out=offsets[1:])
+    return np.frombuffer(text.encode("utf-8"), dtype=np.uint8), offsets
+
+
+def unpack_strings(blob, offsets):
+    text = blob.tobytes().decode("utf-8")
+    return [text[start:end] for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+
+def _save(directory, name, array):
+    np.save(os.path.join(directory, f"{name}.npy"), array)
+
+
+def _save_strings(directory, name, strings):
+    blob, offsets = pack_strings(strings)
+    _save(directory, name, blob)
+    _save(directory, f"{name}_offsets", offsets)
+
+
+def _load_strings(directory, name):
+    return unpack_strings(_load(directory, name), _load(directory, f"{name}_offsets"))
+
+
+def _save_packed(directory, name, packed):
+    _save(directory, f"{name}_blob", np.frombuffer(packed.blob, dtype=np.uint8))
+    _save(directory, f"{name}_offsets", packed.offsets)
+
+
+def _load_packed(directory, name):
+    packed = PackedStrings()
+    packed.blob = bytearray(_load(directory, f"{name}_blob"))
+    packed.offsets = np.asarray(_load(directory, f"{name}_offsets"))
+    return packed
+
+
+def _load(directory, name):
+    return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+
+
+def build_snapshot(products_csv=PRODUCTS_CSV, boosts_csv=BOOSTS_CSV, directory=SNAPSHOT_DIR):
+    """Parse the CSVs once and write the snapshot directory"""
+    products = read_products(products_csv)
+    boost_dict = load_boost_dict(boosts_csv)
+    catalog = Catalog(products, boost_dict)
+    ngram_index = NgramIndex(catalog)
+
+    os.makedirs(directory, exist_ok=True)
+
+    # Catalog columns
+    _save(directory, "labels", catalog.labels)
+    _save_packed(directory, "display_names", catalog.display_names)
+    _save(directory, "name_missing", catalog.name_missing)
+    _save(directory, "display_category_codes", catalog.display_category_codes)
+    _save(directory, "name_sort_keys", catalog.name_sort_keys)
+    _save(directory, "ids", catalog.ids)
+    _save_strings(directory, "names", catalog.names)
+    _save_packed(directory, "descriptions", catalog.descriptions)
+    _save(directory, "has_description", catalog.has_description)
+    _save(directory, "category_codes", catalog.category_codes)
+
+    # Token index
+    _save_strings(directory, "vocabulary", catalog.token_index.vocabulary)
+    _save(directory, "token_rows", catalog.token_index.rows)
+    _save(directory, "token_offsets", catalog.token_index.offsets)
+
+    # Trigram index as CSR
+    grams = list(ngram_index.postings)
+    lists = [ngram_index.postings[gram] for gram in grams]
+    _save_strings(directory, "ngrams", grams)
+    _save(directory, "ngram_rows", np.concatenate(lists) if lists else np.empty(0, dtype=np.int32))
+    ngram_offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    np.cumsum([len(rows) for rows in lists], out=ngram_offsets[1:])
+    _save(directory, "ngram_offsets", ngram_offsets)
+
+    # Typo-correction delete dictionary (a dict of lists, so pickled rather than .npy)
+    SpellingIndex.from_catalog(catalog).save(os.path.join(directory, SPELLING_FILE))
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "products": catalog.size,
+        "sources": {
+            "products_csv": source_stamp(products_csv),
+            "boosts_csv": source_stamp(boosts_csv),
+        },
+        "category_values": catalog.category_values,
+        "display_category_values": catalog.display_category_values,
+        # In-memory size once loaded, for sizing search hosts
+        "bytes_per_product": round(catalog.memory_report(ngram_index)["bytes_per_product"], 1),
+        "boost_dict": boost_dict,
+    }
+    with open(os.path.join(directory, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_snapshot(directory=SNAPSHOT_DIR, products_csv=PRODUCTS_CSV, boosts_csv=BOOSTS_CSV):
+    """
+    Open a snapshot -> (catalog, ngram_index, boost_dict).
+    Raises FileNotFoundError if there is none, StaleSnapshotError if the source CSVs
+    (when present) no longer match the ones it was built from.
+    """
+    with open(os.path.join(directory, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise StaleSnapshotError(f"snapshot format {manifest.get('format')}, expected {SNAPSHOT_FORMAT}")
+    for key, path in (("products_csv", products_csv), ("boosts_csv", boosts_csv)):
+        if path and os.path.exists(path) and source_changed(path, manifest["sources"][key]):
+            raise StaleSnapshotError(f"{path} changed since the snapshot was built")
+
+    catalog = Catalog.__new__(Catalog)
+    catalog.size = manifest["products"]
+    catalog.labels = np.asarray(_load(directory, "labels"))
+    catalog.display_names = _load_packed(directory, "display_names")
+    catalog.name_missing = np.asarray(_load(directory, "name_missing"))
+    catalog.display_category_values = manifest["display_category_values"]
+    catalog.display_category_codes = np.asarray(_load(directory, "display_category_codes"))
+    catalog.ids = np.asarray(_load(directory, "ids"))
+    catalog.live = np.ones(catalog.size, dtype=bool)
+    catalog.deleted = 0
+    catalog._name_sort_keys = np.asarray(_load(directory, "name_sort_keys"))
+    catalog.names = _load_strings(directory, "names")
+    catalog.descriptions = _load_packed(directory, "descriptions")
+    catalog.has_description = np.asarray(_load(directory, "has_description"))
+    catalog.summaries = []
+    catalog.category_values = manifest["category_values"]
+    catalog.category_codes = np.asarray(_load(directory, "category_codes"))
+    catalog.partitions = None
+
+    token_index = TokenIndex.__new__(TokenIndex)
+    token_index.size = catalog.size
+    token_index.vocabulary = _load_strings(directory, "vocabulary")
+    token_index.token_ids = {token: i for i, token in enumerate(token_index.vocabulary)}
+    token_index.rows = np.asarray(_load(directory, "token_rows"))
+    token_index.offsets = np.asarray(_load(directory, "token_offsets"))
+    catalog.token_index = token_index
+
+    boost_dict = manifest["boost_dict"]
+    catalog.set_boosts(boost_dict)
+
+    ngram_index = NgramIndex.__new__(NgramIndex)
+    ngram_index.size = catalog.size
+    ngram_index.include_descriptions = False
+    ngram_rows = _load(directory, "ngram_rows")
+    ngram_offsets = _load(directory, "ngram_offsets").tolist()
+    ngram_index.postings = {
+        gram: ngram_rows[start:end]
+        for gram, start, end in zip(_load_strings(directory, "ngrams"), ngram_offsets[:-1], ngram_offsets[1:])
+    }
+
+    return catalog, ngram_index, boost_dict
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the binary catalog snapshot")
+    parser.add_argument("--products", default=PRODUCTS_CSV)
+    parser.add_argument("--boosts", default=BOOSTS_CSV)
+    parser.add_argument("--output", default=SNAPSHOT_DIR)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    manifest = build_snapshot(args.products, args.boosts, args.output)
+    print(f"✅ Snapshot of {manifest['products']} products written to {args.output}/ "
+          f"in {time.perf_counter() - start:.1f}s ({manifest['bytes_per_product']:.0f} bytes/product in memory)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Symmetric-delete typo correction (SymSpell style)
+Every catalog term is indexed under all the strings you get by deleting up to
+max_distance characters from its prefix. A misspelled query token is looked up
+the same way, so its candidate corrections come from a handful of dict lookups
+instead of fuzzy-matching every product name. Words that only appear in
+descriptions are known (never corrected) but are not correction targets.
+"""
+
+import pickle
+import string
+from itertools import combinations
+
+import numpy as np
+from rapidfuzz.distance import OSA
+
+
+class SpellingIndex:
+    """Delete dictionary over the product name and category vocabulary"""
+
+    def __init__(self, frequencies=None, max_distance=2, prefix_length=7, min_length=4, short_length=5,
+                 known_words=()):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        # Tokens shorter than this are left alone (too many near neighbours)
+        self.min_length = min_length
+        # Tokens this short are corrected at distance 1 at most
+        self.short_length = short_length
+        self.frequencies = {}
+        self.deletes = {}
+        # Valid words that are not correction targets (description vocabulary)
+        self.known_words = set(known_words)
+        self.add_terms(frequencies or {})
+
+    @classmethod
+    def from_catalog(cls, catalog, **kwargs):
+        """
+        Terms from product name tokens and category names, weighted by product count;
+        description words are known words
+        """
+        token_index = catalog.token_index
+        frequencies = dict(zip(token_index.vocabulary, np.diff(token_index.offsets).tolist()))
+        products_per_category = np.bincount(catalog.category_codes, minlength=len(catalog.category_values))
+        for category, count in zip(catalog.category_values, products_per_category.tolist()):
+            for token in category.split():
+                frequencies[token] = frequencies.get(token, 0) + count
+        spelling = cls(frequencies, **kwargs)
+        spelling.add_known_words(catalog, range(catalog.size))
+        return spelling
+
+    def add_known_words(self, catalog, rows):
+        """Add the description words of catalog `rows` as known words"""
+        known_words = self.known_words
+        for row in rows:
+            if catalog.has_description[row]:
+                known_words.update(word.strip(string.punctuation) for word in catalog.descriptions[row].split())
+        known_words.discard("")
+
+    def add_rows(self, catalog, rows):
+        """Add the name, category and description words of catalog `rows` (appended by Catalog.apply_changes)"""
+        frequencies = {}
+        for row in rows:
+            for token in catalog.names[row].split() + catalog.category_values[catalog.category_codes[row]].split():
+                frequencies[token] = frequencies.get(token, 0) + 1
+        self.add_terms(frequencies)
+        self.add_known_words(catalog, rows)
+
+    def _delete_variants(self, word):
+        """word's prefix with 0..max_distance characters deleted"""
+        prefix = word[:self.prefix_length]
+        variants = {prefix}
+        for count in range(1, min(self.max_distance, len(prefix)) + 1):
+            for positions in combinations(range(len(prefix)), count):
+                variants.add("".join(c for i, c in enumerate(prefix) if i not in positions))
+        return variants
+
+    def add_terms(self, frequencies):
+        """Add (or re-weight) terms; term -> number of products containing it"""
+        for term, count in frequencies.items():
+            if term not in self.frequencies:
+                for variant in self._delete_variants(term):
+                    self.deletes.setdefault(variant, []).append(term)
+            self.frequencies[term] = self.frequencies.get(term, 0) + count
+
+    def suggestions(self, token, max_distance=None):
+        """[(term, distance, frequency)] within max_distance, nearest and most common first"""
+        max_distance = self.max_distance if max_distance is None else max_distance
+        candidates = set()
+        for variant in self._delete_variants(token):
+            candidates.update(self.deletes.get(variant, ()))
+
+        found = []
+        for term in candidates:
+            if abs(len(term) - len(token)) > max_distance:
+                continue
+            distance = OSA.distance(token, term, score_cutoff=max_distance)
+            if distance <= max_distance:
+                found.append((term, distance, self.frequencies[term]))
+        found.sort(key=lambda s: (s[1], -s[2], s[0]))
+        return found
+
+    def correct_token(self, token):
+        """Nearest catalog term for an unknown token, or the token itself"""
+        if (len(token) < self.min_length or token in self.frequencies or token in self.known_words
+                or any(c.isdigit() for c in token)):
+            return token
+        found = self.suggestions(token, 1 if len(token) <= self.short_length else None)
+        return found[0][0] if found else token
+
+    def correct(self, query, keep=()):
+        """
+        Query with each unknown token replaced by its correction; unchanged if none applies.
+        Tokens containing one of the `keep` keywords (Rules.keywords) are left as typed,
+        so corrections never switch a category filter or brand block off.
+        """
+        tokens = query.lower().split()
+        corrected = [
+            token if any(keyword in token for keyword in keep) else self.correct_token(token)
+            for token in tokens
+        ]
+        return " ".join(corrected) if corrected != tokens else query
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
@@ -0,0 +1,157 @@
+"""
+Incremental catalog sync
+Pulls only the products changed since the last sync (by an updated_at watermark)
+plus the current list of product ids (to spot deletions), runs them through the
+same cleaning and category inference as explore_products.py and
+2_infer_categories.py, and merges them into products_with_inferred_categories.csv
+and, when given, an already-loaded Catalog, NgramIndex and SpellingIndex in place.
+
+    python -m search_engine.sync --db-url sqlite:///products.db
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from .catalog import PRODUCTS_CSV
+from .categories import add_inferred_categories
+from .products_db import clean_products, connect, products_query, read_sql
+
+SYNC_STATE = "catalog_sync_state.json"
+WATERMARK_COLUMN = "updated_at"
+
+
+def load_state(path=SYNC_STATE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state, path=SYNC_STATE):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+
+
+def fetch_changes(con, watermark=None, watermark_column=WATERMARK_COLUMN):
+    """
+    Products with watermark_column >= watermark (all products when there is none yet).
+    Rows at the watermark itself are fetched again: one committed after the last sync
+    with the same timestamp would otherwise never be picked up.
+    """
+    sql = products_query(extra_columns=[watermark_column],
+                         where=f"p.{watermark_column} >= :watermark" if watermark is not None else "")
+    params = {"watermark": watermark} if watermark is not None else None
+    return read_sql(sql, con, params=params)
+
+
+def fetch_ids(con):
+    return set(read_sql("SELECT id FROM products", con)["id"].tolist())
+
+
+def merge_products(products, changed, deleted_ids):
+    """Drop the old versions of changed and deleted products, then append the changed rows"""
+    stale = products["id"].isin(set(changed["id"]) | set(deleted_ids))
+    changed = changed.reindex(columns=products.columns)
+    return pd.concat([products[~stale], changed], ignore_index=True)
+
+
+def sync_catalog(con, products_csv=PRODUCTS_CSV, state_path=SYNC_STATE,
+                 watermark_column=WATERMARK_COLUMN, catalog=None, ngram_index=None, spelling=None):
+    """
+    Bring products_csv (and catalog / ngram_index / spelling, if given) up to date with the database.
+    Returns a report dict with the number of inserted, updated and deleted products.
+    """
+    start = time.perf_counter()
+    state = load_state(state_path)
+    watermark = state.get("watermark") if os.path.exists(products_csv) else None
+
+    changed = fetch_changes(con, watermark, watermark_column)
+    db_ids = fetch_ids(con)
+
+    # Rows at the watermark that the last sync applied with the same content are skipped;
+    # a product edited again within the same timestamp has a new content hash
+    stamps = changed[watermark_column].astype(str)
+    hashes = [str(h) for h in pd.util.hash_pandas_object(changed, index=False).tolist()]
+    synced_at_watermark = state.get("watermark_rows", {}) if watermark is not None else {}
+    fresh = np.asarray([
+        not (stamp == watermark and synced_at_watermark.get(str(product_id)) == row_hash)
+        for stamp, product_id, row_hash in zip(stamps, changed["id"].tolist(), hashes)
+    ], dtype=bool)
+    changed, stamps = changed[fresh], stamps[fresh]
+    hashes = [row_hash for row_hash, keep in zip(hashes, fresh) if keep]
+
+    new_watermark = stamps.max() if len(changed) else watermark
+    new_watermark_rows = dict(synced_at_watermark) if new_watermark == watermark else {}
+    new_watermark_rows.update(
+        (str(product_id), row_hash)
+        for product_id, stamp, row_hash in zip(changed["id"].tolist(), stamps, hashes)
+        if stamp == new_watermark
+    )
+
+    # Same preparation a full export gets (explore_products.py -> 2_infer_categories.py)
+    changed = add_inferred_categories(clean_products(changed.drop(columns=[watermark_column])))
+
+    if os.path.exists(products_csv):
+        products = pd.read_csv(products_csv)
+    else:
+        products = changed.iloc[:0]
+
+    known_ids = set(products["id"].tolist())
+    deleted_ids = sorted(known_ids - db_ids)
+
+    report = {
+        "mode": "incremental" if watermark is not None else "full",
+        "inserted": int((~changed["id"].isin(known_ids)).sum()),
+        "updated": int(changed["id"].isin(known_ids).sum()),
+        "deleted": len(deleted_ids),
+    }
+
+    if len(changed) or deleted_ids:
+        products = merge_products(products, changed, deleted_ids)
+        # Written to a temporary file first so readers never see a half-written CSV
+        tmp_path = f"{products_csv}.tmp"
+        products.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, products_csv)
+
+        if catalog is not None:
+            catalog.apply_changes(changed.reset_index(drop=True), deleted_ids, ngram_index, spelling)
+
+    if new_watermark is not None:
+        state["watermark"] = new_watermark
+        state["watermark_rows"] = new_watermark_rows
+    state["synced_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    save_state(state, state_path)
+
+    report["products"] = len(products)
+    report["watermark"] = state.get("watermark")
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync the product catalog CSV from the products database")
+    parser.add_argument("--db-url", default=None, help="defaults to DB_URL or the DB_* variables")
+    parser.add_argument("--products", default=PRODUCTS_CSV)
+    parser.add_argument("--state", default=SYNC_STATE)
+    parser.add_argument("--watermark-column", default=WATERMARK_COLUMN)
+    parser.add_argument("--snapshot", default=None, help="rebuild this snapshot directory after syncing")
+    args = parser.parse_args()
+
+    con = connect(args.db_url)
+    report = sync_catalog(con, args.products, args.state, args.watermark_column)
+    print(f"✅ {report['mode'].title()} sync: {report['inserted']} inserted, {report['updated']} updated, "
+          f"{report['deleted']} deleted -> {report['products']} products in {report['seconds']}s")
+
+    if args.snapshot:
+        from .snapshot import build_snapshot
+        build_snapshot(args.products, directory=args.snapshot)
+        print(f"💾 Snapshot rebuilt in {args.snapshot}/")
+
+
+if __name__ == "__main__":
+    main()
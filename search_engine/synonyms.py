@@ -0,0 +1,80 @@
+"""
+Query synonym rewriting
+Loads synonyms.json ({"canonical": ["variant", ...]}) into a phrase table keyed on
+token tuples and rewrites variants in a query to their canonical term, longest
+phrase first ("apple phone 15" -> "iphone 15"). The file is re-read when it
+changes on disk, so edits apply without restarting.
+"""
+
+import json
+import os
+import threading
+import time
+
+
+class SynonymTable:
+    """Variant phrase (as a token tuple) -> canonical term"""
+
+    def __init__(self, path="synonyms.json", check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.mtime = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+        # (phrases, longest phrase in tokens), swapped as one object on reload
+        self.table = ({}, 0)
+        self.reload_if_changed(force=True)
+
+    def load(self):
+        """Read the file and rebuild the phrase table"""
+        phrases = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                synonyms = json.load(f)
+            for canonical, variants in synonyms.items():
+                for variant in variants:
+                    tokens = tuple(variant.lower().split())
+                    if tokens:
+                        phrases[tokens] = canonical.lower()
+        self.table = (phrases, max((len(tokens) for tokens in phrases), default=0))
+
+    def reload_if_changed(self, force=False):
+        """Reload when the file's mtime changed; checked at most once per check_interval"""
+        now = time.monotonic()
+        if not force and now - self.checked_at < self.check_interval:
+            return False
+        with self.lock:
+            self.checked_at = now
+            mtime = os.path.getmtime(self.path) if os.path.exists(self.path) else None
+            if not force and mtime == self.mtime:
+                return False
+            self.load()
+            self.mtime = mtime
+            return True
+
+    def canonicalize(self, query):
+        """
+        Query with every synonym variant replaced by its canonical term.
+        Queries without a variant are returned unchanged (not re-spaced or lowercased).
+        """
+        self.reload_if_changed()
+        phrases, longest = self.table
+        if not phrases:
+            return query
+
+        tokens = query.lower().split()
+        rewritten = []
+        changed = False
+        i = 0
+        while i < len(tokens):
+            for length in range(min(longest, len(tokens) - i), 0, -1):
+                canonical = phrases.get(tuple(tokens[i:i + length]))
+                if canonical is not None:
+                    rewritten.append(canonical)
+                    changed = True
+                    i += length
+                    break
+            else:
+                rewritten.append(tokens[i])
+                i += 1
+        return " ".join(rewritten) if changed else query
@@ -0,0 +1,98 @@
+"""
+Name-token vocabulary index
+Each distinct name token is fuzzy-matched against a query token once, and the
+products containing the matching tokens are collected from posting lists.
+"""
+
+import sys
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+# Fuzzy ratio a query token needs against a name token to count as a match
+TOKEN_MATCH_RATIO = 85
+
+
+class TokenIndex:
+    """Distinct name tokens -> product rows (CSR posting lists)"""
+
+    def __init__(self, names):
+        self.size = 0
+        self.vocabulary = []
+        self.token_ids = {}
+        # Postings for vocabulary[i] are rows[offsets[i]:offsets[i + 1]]
+        self.rows = np.empty(0, dtype=np.int32)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.add_rows(names)
+
+    def add_rows(self, names):
+        """Index `names` as new rows appended after the current ones"""
+        new_ids = []
+        new_rows = []
+        for row, name in enumerate(names, start=self.size):
+            for token in name.split():
+                token_id = self.token_ids.get(token)
+                if token_id is None:
+                    # Interned: one copy per distinct token, shared by the tables built from the vocabulary
+                    token = sys.intern(token)
+                    token_id = self.token_ids[token] = len(self.vocabulary)
+                    self.vocabulary.append(token)
+                new_ids.append(token_id)
+                new_rows.append(row)
+
+        old_ids = np.repeat(np.arange(len(self.offsets) - 1), np.diff(self.offsets))
+        all_ids = np.concatenate([old_ids, np.asarray(new_ids, dtype=np.int64)])
+        all_rows = np.concatenate([self.rows, np.asarray(new_rows, dtype=np.int32)])
+
+        # Stable sort keeps each posting list in row order
+        order = np.argsort(all_ids, kind='stable')
+        self.rows = all_rows[order]
+        self.offsets = np.zeros(len(self.vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(all_ids, minlength=len(self.vocabulary)), out=self.offsets[1:])
+        self.size += len(names)
+
+    def postings(self, token_id):
+        return self.rows[self.offsets[token_id]:self.offsets[token_id + 1]]
+
+    def matching_tokens(self, query_tokens):
+        """For each query token, the vocabulary ids with fuzz.ratio > 85"""
+        if not query_tokens or not self.vocabulary:
+            return [np.empty(0, dtype=np.int64) for _ in query_tokens]
+        ratios = process.cdist(
+            query_tokens, self.vocabulary, scorer=fuzz.ratio, dtype=np.float64, workers=-1
+        )
+        return [np.flatnonzero(row > TOKEN_MATCH_RATIO) for row in ratios]
+
+    def match_table(self, tokens):
+        """
+        Query token -> rows whose name has a token with fuzz.ratio > 85 against it,
+        for many tokens with one pass over the vocabulary (see SearchEngine.search_many)
+        """
+        tokens = list(dict.fromkeys(tokens))
+        return {
+            token: np.concatenate([self.postings(t) for t in token_ids]) if len(token_ids)
+            else np.empty(0, dtype=np.int32)
+            for token, token_ids in zip(tokens, self.matching_tokens(tokens))
+        }
+
+    def token_matches(self, query_tokens, table=None):
+        """
+        Bitsets (query tokens x products): True where the product name has a
+        token with fuzz.ratio > 85 against the query token.
+        `table` is a match_table() covering the query tokens, if one was built.
+        """
+        if table is None:
+            table = self.match_table(query_tokens)
+        matches = np.zeros((len(query_tokens), self.size), dtype=bool)
+        for i, token in enumerate(query_tokens):
+            matches[i, table[token]] = True
+        return matches
+
+    def exact_matches(self, tokens):
+        """Bitsets (tokens x products): True where the product name contains the token itself"""
+        matches = np.zeros((len(tokens), self.size), dtype=bool)
+        for i, token in enumerate(tokens):
+            token_id = self.token_ids.get(token)
+            if token_id is not None:
+                matches[i, self.postings(token_id)] = True
+        return matches
@@ -0,0 +1,98 @@
+"""
+Scoring traces
+Opt-in instrumentation for SearchEngine.search() / score_catalog(): wall time and
+number of products eliminated per pipeline stage for one query (QueryTrace), and
+the same summed over a batch of queries (StageCounters). Calls without a trace
+only pay for a `trace is None` check per stage.
+"""
+
+import time
+
+# Pipeline order, for reports (short_query is timed together with name_cutoff)
+STAGES = (
+    "candidates", "category_penalty", "deleted", "brand_block", "multi_token", "bonuses",
+    "short_query", "name_cutoff", "description_cutoff", "score_gates", "min_threshold", "rank",
+)
+
+
+def _ordered(stages):
+    order = {stage: i for i, stage in enumerate(STAGES)}
+    return [
+        {"stage": stage, **stages[stage]}
+        for stage in sorted(stages, key=lambda s: order.get(s, len(order)))
+    ]
+
+
+class QueryTrace:
+    """Per-stage wall time and eliminations of one search"""
+
+    def __init__(self, query):
+        self.query = query
+        self.scored = 0
+        self.passed = 0
+        self.stages = {}  # stage -> {"ms", "eliminated"}
+        self._last = time.perf_counter()
+
+    def _stage(self, stage):
+        return self.stages.setdefault(stage, {"ms": 0.0, "eliminated": 0})
+
+    def lap(self, stage):
+        """Charge the time since the previous lap (or since the trace was created) to `stage`"""
+        now = time.perf_counter()
+        self._stage(stage)["ms"] += (now - self._last) * 1000
+        self._last = now
+
+    def add_counts(self, counts):
+        """Elimination counts from score_catalog()"""
+        for stage, count in counts.items():
+            if stage == "scored":
+                self.scored += count
+            elif stage == "passed":
+                self.passed += count
+            else:
+                self._stage(stage)["eliminated"] += count
+
+    @property
+    def total_ms(self):
+        return sum(entry["ms"] for entry in self.stages.values())
+
+    def as_dict(self):
+        return {
+            "query": self.query,
+            "total_ms": self.total_ms,
+            "scored": self.scored,
+            "passed": self.passed,
+            "stages": _ordered(self.stages),
+        }
+
+
+class StageCounters:
+    """QueryTraces summed over a batch of queries"""
+
+    def __init__(self):
+        self.queries = 0
+        self.scored = 0
+        self.passed = 0
+        self.stages = {}
+
+    def add(self, trace):
+        self.queries += 1
+        self.scored += trace.scored
+        self.passed += trace.passed
+        for stage, entry in trace.stages.items():
+            total = self.stages.setdefault(stage, {"ms": 0.0, "eliminated": 0})
+            total["ms"] += entry["ms"]
+            total["eliminated"] += entry["eliminated"]
+
+    @property
+    def total_ms(self):
+        return sum(entry["ms"] for entry in self.stages.values())
+
+    def as_dict(self):
+        return {
+            "queries": self.queries,
+            "total_ms": self.total_ms,
+            "scored": self.scored,
+            "passed": self.passed,
+            "stages": _ordered(self.stages),
+        }
@@ -0,0 +1,132 @@
+# test_catalog_snapshot.py
+# Binary catalog snapshot (search_engine/snapshot.py): a loaded snapshot must search
+# exactly like the catalog built from its CSVs, an untouched CSV must not be hashed
+# on load, a touched but unchanged CSV must not count as stale, and an edited CSV
+# (same size or not) or an older snapshot format must raise StaleSnapshotError.
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+from search_engine import SearchEngine, compile_rules
+from search_engine import snapshot
+from search_engine.bench import generate_catalog, query_mix
+from search_engine.snapshot import StaleSnapshotError, build_snapshot, load_snapshot
+from search_engine.spelling import SpellingIndex
+
+failures = []
+
+with tempfile.TemporaryDirectory() as tmp:
+    products_csv = os.path.join(tmp, "products.csv")
+    boosts_csv = os.path.join(tmp, "boosts.csv")
+    directory = os.path.join(tmp, "catalog.snapshot")
+    products = generate_catalog(3000, seed=5)
+    products.to_csv(products_csv, index=False)
+    categories = sorted(products["category_final"].dropna().unique())
+    pd.DataFrame({"category": categories, "boost": [1.0 + i % 4 * 0.5 for i in range(len(categories))]}) \
+        .to_csv(boosts_csv, index=False)
+
+    build_snapshot(products_csv, boosts_csv, directory)
+
+    # Count the hashing load_snapshot does
+    hashed = []
+    file_checksum = snapshot.file_checksum
+
+    def counting_checksum(path):
+        hashed.append(path)
+        return file_checksum(path)
+
+    snapshot.file_checksum = counting_checksum
+
+    def load():
+        hashed.clear()
+        try:
+            load_snapshot(directory, products_csv, boosts_csv)
+        except StaleSnapshotError as exc:
+            return f"stale ({exc})"
+        return f"fresh ({len(hashed)} hashed)"
+
+    def expect(label, found, expected):
+        if found != expected:
+            failures.append(f"{label}: {found}, expected {expected}")
+        print(f"📦 {label}: {found}")
+
+    # Round trip: the snapshot searches like the CSVs it was built from
+    catalog, ngram_index, boost_dict = load_snapshot(directory, products_csv, boosts_csv)
+    expect("untouched CSVs", f"fresh ({len(hashed)} hashed)", "fresh (0 hashed)")
+    rules = compile_rules("modular")
+    loaded = SearchEngine(catalog, rules, ngram_index)
+    built = SearchEngine.from_csv(products_csv, boosts_csv, index=True)
+    for query in query_mix(seed=2):
+        for use_index in (False, True):
+            a = loaded.search(query, use_index=use_index)
+            b = built.search(query, use_index=use_index)
+            if not (a.index.tolist() == b.index.tolist() and a["name"].tolist() == b["name"].tolist()
+                    and a["score"].tolist() == b["score"].tolist()):
+                failures.append(f"search {query!r} (use_index={use_index}): snapshot {a['name'].tolist()}, "
+                                f"CSV {b['name'].tolist()}")
+    spelling = SpellingIndex.load(os.path.join(directory, snapshot.SPELLING_FILE))
+    fresh_spelling = SpellingIndex.from_catalog(built.catalog)
+    for query in ["chiar", "leptop", "jaens", "fyer"]:
+        if spelling.correct(query) != fresh_spelling.correct(query):
+            failures.append(f"spelling {query!r}: snapshot {spelling.correct(query)!r}, "
+                            f"CSV {fresh_spelling.correct(query)!r}")
+    print(f"📦 Round trip: {len(failures)} mismatches")
+
+    # Touched (new mtime) but the same bytes: hashed once, still fresh
+    stat = os.stat(products_csv)
+    os.utime(products_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+    expect("touched products CSV", load(), "fresh (1 hashed)")
+
+    # Same size, different content
+    with open(products_csv, "r+b") as f:
+        data = bytearray(f.read())
+        at = data.index(b"\n") + 1
+        data[at:at + 1] = b"9" if data[at:at + 1] != b"9" else b"8"
+        f.seek(0)
+        f.write(data)
+    stat = os.stat(products_csv)
+    os.utime(products_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+    expect("edited products CSV (same size)", load().split(" (")[0], "stale")
+
+    # Grown CSV: the size alone says stale, nothing is hashed
+    build_snapshot(products_csv, boosts_csv, directory)
+    with open(products_csv, "a", encoding="utf-8") as f:
+        f.write("999999,New Product,,Kitchen\n")
+    hashed.clear()
+    expect("appended products CSV", load().split(" (")[0], "stale")
+    expect("hashes for a size change", len(hashed), 0)
+
+    # Edited boosts
+    build_snapshot(products_csv, boosts_csv, directory)
+    with open(boosts_csv, "a", encoding="utf-8") as f:
+        f.write("Gadgets,2.0\n")
+    expect("edited boosts CSV", load().split(" (")[0], "stale")
+
+    # Older snapshot format
+    build_snapshot(products_csv, boosts_csv, directory)
+    manifest_path = os.path.join(directory, "manifest.json")
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    manifest["format"] = snapshot.SNAPSHOT_FORMAT - 1
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    expect("older format", load().split(" (")[0], "stale")
+
+    # The CLI must not trip runpy's double-import warning
+    cli = subprocess.run([sys.executable, "-W", "error::RuntimeWarning", "-m", "search_engine.snapshot",
+                          "--products", products_csv, "--boosts", boosts_csv, "--output", directory],
+                         cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True)
+    if cli.returncode != 0 or "RuntimeWarning" in cli.stderr:
+        failures.append(f"python -m search_engine.snapshot: {cli.stderr.strip()}")
+    expect("python -m search_engine.snapshot", load(), "fresh (0 hashed)")
+    snapshot.file_checksum = file_checksum
+
+print("="*80)
+status = "✅ PASS" if not failures else f"⚠️ FAIL ({failures})"
+print(f"📦 Catalog snapshot round trip and staleness: {status}")
+print("="*80)
+assert not failures, failures
@@ -0,0 +1,100 @@
+# test_catalog_sync.py
+# Incremental sync (search_engine/sync.py) against a SQLite stand-in for the products
+# database: inserts, updates, deletes, a late insert at the watermark timestamp and a
+# second edit of a product within the same timestamp must all reach the CSV and the
+# in-place catalog, and a sync with nothing new must change nothing.
+import os
+import sqlite3
+import tempfile
+
+import pandas as pd
+
+from search_engine import Catalog, NgramIndex, SearchEngine, compile_rules
+from search_engine.sync import sync_catalog
+
+PRODUCT_COLUMNS = "id, name, description, category_id, brand_id, specifications, status, price, updated_at"
+
+
+def insert(con, product_id, name, category_id, updated_at):
+    con.execute(f"INSERT INTO products ({PRODUCT_COLUMNS}) VALUES (?, ?, NULL, ?, 1, '{{}}', 'active', 1, ?)",
+                (product_id, name, category_id, updated_at))
+    con.commit()
+
+
+def update(con, product_id, name, updated_at):
+    con.execute("UPDATE products SET name = ?, updated_at = ? WHERE id = ?", (name, updated_at, product_id))
+    con.commit()
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    products_csv = os.path.join(tmp, "products.csv")
+    state_path = os.path.join(tmp, "sync_state.json")
+    con = sqlite3.connect(os.path.join(tmp, "products.db"))
+    con.execute("CREATE TABLE categories (id INTEGER, name TEXT)")
+    con.execute(f"CREATE TABLE products ({PRODUCT_COLUMNS})")
+    con.executemany("INSERT INTO categories VALUES (?, ?)", [(1, "Kitchen"), (2, "Mobile Phones")])
+    for product_id, name, category_id in [(1, "Air Fryer 4L", 1), (2, "Itel A70", 2), (3, "Blender", 1)]:
+        insert(con, product_id, name, category_id, "2026-01-01 00:00:00")
+
+    def sync(catalog=None, ngram_index=None):
+        return sync_catalog(con, products_csv, state_path, catalog=catalog, ngram_index=ngram_index)
+
+    def csv_names():
+        products = pd.read_csv(products_csv)
+        return dict(zip(products["id"].tolist(), products["name"].tolist()))
+
+    failures = []
+
+    def expect(label, report, inserted, updated, deleted, names):
+        found = (report["inserted"], report["updated"], report["deleted"])
+        if found != (inserted, updated, deleted):
+            failures.append(f"{label}: inserted/updated/deleted {found}, expected {(inserted, updated, deleted)}")
+        if csv_names() != names:
+            failures.append(f"{label}: CSV names {csv_names()}, expected {names}")
+        live = dict(zip(catalog.ids[catalog.live].tolist(),
+                        catalog.display_rows(catalog.live.nonzero()[0])["name"].tolist()))
+        if live != names:
+            failures.append(f"{label}: catalog names {live}, expected {names}")
+        print(f"🔄 {label}: {report['inserted']} inserted, {report['updated']} updated, "
+              f"{report['deleted']} deleted (watermark {report['watermark']})")
+
+    report = sync()
+    catalog = Catalog(pd.read_csv(products_csv), {})
+    ngram_index = NgramIndex(catalog)
+    names = {1: "Air Fryer 4L", 2: "Itel A70", 3: "Blender"}
+    expect("full sync", report, 3, 0, 0, names)
+
+    insert(con, 4, "Tecno Spark 10", 2, "2026-02-01 00:00:00")
+    update(con, 1, "Air Fryer 4.5L", "2026-02-01 00:00:00")
+    con.execute("DELETE FROM products WHERE id = 2")
+    con.commit()
+    names = {1: "Air Fryer 4.5L", 3: "Blender", 4: "Tecno Spark 10"}
+    expect("insert + update + delete", sync(catalog, ngram_index), 1, 1, 1, names)
+
+    # Committed after that sync, with the watermark's own timestamp
+    insert(con, 5, "Rice Cooker", 1, "2026-02-01 00:00:00")
+    names[5] = "Rice Cooker"
+    expect("late insert at the watermark", sync(catalog, ngram_index), 1, 0, 0, names)
+
+    # A second edit of an already synced product within the same timestamp
+    update(con, 1, "Air Fryer 5L", "2026-02-01 00:00:00")
+    names[1] = "Air Fryer 5L"
+    expect("re-edit at the watermark", sync(catalog, ngram_index), 0, 1, 0, names)
+
+    expect("nothing new", sync(catalog, ngram_index), 0, 0, 0, names)
+
+    # The synced-in-place catalog searches like one loaded fresh from the CSV
+    rules = compile_rules("modular", min_score_thresholds={"default": 0})
+    in_place = SearchEngine(catalog, rules, ngram_index)
+    reloaded = SearchEngine(Catalog(pd.read_csv(products_csv), {}), rules)
+    for query in ["air fryer", "tecno", "itel", "rice cooker", "blender"]:
+        a, b = in_place.search(query), reloaded.search(query)
+        if a["name"].tolist() != b["name"].tolist() or a["score"].tolist() != b["score"].tolist():
+            failures.append(f"search {query!r}: in place {a['name'].tolist()}, reloaded {b['name'].tolist()}")
+    con.close()
+
+print("="*80)
+status = "✅ PASS" if not failures else f"⚠️ FAIL ({failures})"
+print(f"🗄️ Incremental sync against SQLite: {status}")
+print("="*80)
+assert not failures, failures
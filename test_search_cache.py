@@ -0,0 +1,82 @@
+# test_search_cache.py
+# Result cache (search_engine/cache.py): TTL expiry, LRU eviction, smaller top_n
+# requests served from a larger cached entry, version invalidation, and the
+# hit/miss/eviction/expiration/invalidation counters stats() reports for them.
+import time
+
+import pandas as pd
+
+from search_engine import SearchCache, SearchEngine
+from search_engine.bench import generate_catalog
+
+failures = []
+
+
+def results(count, name="product"):
+    return pd.DataFrame({"name": [f"{name} {i}" for i in range(count)], "score": [100.0 - i for i in range(count)]})
+
+
+def expect(label, found, expected):
+    if found != expected:
+        failures.append(f"{label}: {found}, expected {expected}")
+    print(f"🗄️ {label}: {found}")
+
+
+def counters(cache):
+    stats = cache.stats()
+    return {key: stats[key] for key in ("size", "hits", "misses", "evictions", "expirations", "invalidations")}
+
+
+# TTL: an entry older than ttl is dropped on lookup and counted as an expiration
+cache = SearchCache(maxsize=8, ttl=0.05)
+cache.put("iphone", 10, results(10), version=1)
+expect("fresh entry", cache.get("iphone", 10, version=1) is not None, True)
+time.sleep(0.1)
+expect("expired entry", cache.get("iphone", 10, version=1), None)
+expect("TTL counters", counters(cache),
+       {"size": 0, "hits": 1, "misses": 1, "evictions": 0, "expirations": 1, "invalidations": 0})
+
+# LRU: a lookup refreshes an entry, so the least recently used one is evicted
+cache = SearchCache(maxsize=2, ttl=600)
+cache.put("iphone", 10, results(10), version=1)
+cache.put("laptop", 10, results(10), version=1)
+cache.get("iphone", 10, version=1)
+cache.put("fridge", 10, results(10), version=1)
+expect("evicted keys", [key for key in ("iphone", "laptop", "fridge") if cache.get(key, 10, version=1) is None],
+       ["laptop"])
+expect("LRU counters", counters(cache),
+       {"size": 2, "hits": 3, "misses": 1, "evictions": 1, "expirations": 0, "invalidations": 0})
+
+# top_n: a larger entry serves smaller requests; an entry that ran out of matches serves any
+cache = SearchCache(maxsize=8, ttl=600)
+cache.put("iphone", 10, results(10), version=1)
+expect("top 5 from a top 10 entry", cache.get("iphone", 5, version=1).equals(results(10).head(5)), True)
+expect("top 20 from a top 10 entry", cache.get("iphone", 20, version=1), None)
+cache.put("iphone", 3, results(3, "smaller"), version=1)
+expect("top 3 put keeps the top 10 entry", cache.get("iphone", 10, version=1).equals(results(10)), True)
+cache.put("samba", 10, results(4), version=1)
+expect("top 50 from an exhausted top 10 entry", cache.get("samba", 50, version=1).equals(results(4)), True)
+expect("top_n counters", counters(cache),
+       {"size": 2, "hits": 3, "misses": 1, "evictions": 0, "expirations": 0, "invalidations": 0})
+
+# Version: a new catalog/config version drops every entry once
+cache = SearchCache(maxsize=8, ttl=600)
+engine = SearchEngine.from_products(generate_catalog(500, seed=1), "modular")
+version = engine.catalog.version
+cache.put("iphone", 10, engine.search("iphone"), version)
+cache.put("laptop", 10, engine.search("laptop"), version)
+expect("same version", cache.get("iphone", 10, version) is not None, True)
+engine.catalog.set_boosts({"laptops & ultrabooks": 2.0})
+expect("catalog version bumped", engine.catalog.version != version, True)
+expect("after a boost change", cache.get("iphone", 10, engine.catalog.version), None)
+expect("version counters", counters(cache),
+       {"size": 0, "hits": 1, "misses": 1, "evictions": 0, "expirations": 0, "invalidations": 1})
+cache.put("iphone", 10, engine.search("iphone"), engine.catalog.version)
+cache.clear()
+expect("clear", cache.stats()["size"], 0)
+
+print("="*80)
+status = "✅ PASS" if not failures else f"⚠️ FAIL ({failures})"
+print(f"🗄️ Search cache TTL, LRU, top_n and invalidation: {status}")
+print("="*80)
+assert not failures, failures
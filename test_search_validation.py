@@ -1,86 +1,41 @@
 # test_search_validation_full.py
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 from rapidfuzz import fuzz
 
-# ==========================================
-# BOOST CONFIGURATION
-# ==========================================
-boost_dict = {
-    "iphones": 1.5,
-    "android phones": 1.5,
-    "mobile phones": 1.4,
-    "fashion": 1.2,
-    "electronics": 1.0,
-    "inverters": 1.1,
-    "refrigerators": 1.1,
-    "wigs and weaves": 1.3,
-    "furniture": 1.1,
-}
+from search_engine import SearchCache, SearchEngine
+from search_engine.bench import generate_catalog, query_mix
+from search_engine.rules import PROFILES
+from search_engine.synonyms import SynonymTable
 
 # ==========================================
-# SCORING FUNCTION
+# SEARCH ENGINE
 # ==========================================
-def score_product(product, query):
-    name = str(product.get('name', '')).lower()
-    desc = str(product.get('description', '')).lower()
-    category = str(product.get('category_final', 'unknown')).lower()
-    query = query.lower()
-
-    # --- fuzzy match scores ---
-    name_score = fuzz.partial_ratio(query, name)
-    desc_score = fuzz.partial_ratio(query, desc) if desc else 0
+# Boosts and scoring rules are the "validation" profile in search_engine/rules.py
 
-    # --- token matching ---
-    query_tokens = set(query.split())
-    name_tokens = set(name.split())
-    desc_tokens = set(desc.split())
-
-    has_strong_token_match = any(
-        fuzz.ratio(qt, nt) > 85 for qt in query_tokens for nt in name_tokens
-    )
-
-    # --- strict filter ---
-    if name_score < 60 and not has_strong_token_match:
-        if len(query_tokens) == 1 or desc_score < 60:
-            return 0
-
-    boost = max(1.0, min(boost_dict.get(category, 1.0), 3.0))
-    if boost > 2.0 and name_score < 70 and not has_strong_token_match:
-        return 0
-
-    # --- base scoring ---
-    base_score = 0.85 * name_score + 0.15 * desc_score
-    if query in name:
-        base_score = min(base_score + 15, 100)
-    if has_strong_token_match:
-        base_score = min(base_score + 10, 100)
-
-    # --- apply boost ---
-    final_score = base_score * boost
-    return final_score
+# Example mock dataset
+data = [
+    {"name": "iPhone 14 Pro", "description": "Apple smartphone", "category_final": "iphones"},
+    {"name": "Samsung Galaxy A14", "description": "Android phone", "category_final": "android phones"},
+    {"name": "Air Fryer 4L", "description": "Kitchen appliance", "category_final": "kitchen"},
+    {"name": "Office Chair", "description": "Ergonomic swivel chair", "category_final": "furniture"},
+    {"name": "Samba Classic", "description": "Adidas male shoes", "category_final": "male shoes"},
+    {"name": "Human Hair Wig", "description": "Curly lace front wig", "category_final": "wigs and weaves"},
+    {"name": "Solar Inverter 2.5kVA", "description": "Power backup inverter", "category_final": "inverters"},
+    {"name": "Jeans Denim Blue", "description": "Men's casual fashion jeans", "category_final": "fashion"},
+    {"name": "LG Fridge", "description": "Double door refrigerator", "category_final": "refrigerators"},
+]
+engine = SearchEngine.from_products(pd.DataFrame(data), profile="validation")
 
 
-# ==========================================
-# SEARCH FUNCTION
-# ==========================================
 def search(query, top_n=10):
-    # Example mock dataset
-    data = [
-        {"name": "iPhone 14 Pro", "description": "Apple smartphone", "category_final": "iphones"},
-        {"name": "Samsung Galaxy A14", "description": "Android phone", "category_final": "android phones"},
-        {"name": "Air Fryer 4L", "description": "Kitchen appliance", "category_final": "kitchen"},
-        {"name": "Office Chair", "description": "Ergonomic swivel chair", "category_final": "furniture"},
-        {"name": "Samba Classic", "description": "Adidas male shoes", "category_final": "male shoes"},
-        {"name": "Human Hair Wig", "description": "Curly lace front wig", "category_final": "wigs and weaves"},
-        {"name": "Solar Inverter 2.5kVA", "description": "Power backup inverter", "category_final": "inverters"},
-        {"name": "Jeans Denim Blue", "description": "Men's casual fashion jeans", "category_final": "fashion"},
-        {"name": "LG Fridge", "description": "Double door refrigerator", "category_final": "refrigerators"},
-    ]
-    df = pd.DataFrame(data)
-
-    df["score"] = df.apply(lambda x: score_product(x, query), axis=1)
-    df = df[df["score"] > 0].sort_values("score", ascending=False).head(top_n)
-    return df
+    return engine.search(query, top_n=top_n)
 
 
 # ==========================================
@@ -151,3 +106,369 @@ failed = len(validation_df[validation_df['status'] != '✅ PASS'])
 print("\n" + "="*80)
 print(f"📊 Results: {passed}/{len(test_queries)} passed ({passed/len(test_queries)*100:.0f}%)")
 print("="*80)
+
+# ==========================================
+# SCORING PARITY CHECK
+# ==========================================
+# The original per-row score_product() of each profile's script, kept as the
+# reference: the engine's batched scoring must give exactly the same scores.
+# Rule tables come from the profile config; the logic is as it was in each script.
+
+# modular_testing.py (5_test_search_strict.py is the same without brand blocks)
+def score_product_modular(product, query, boost_dict, config):
+    name = str(product['name']).lower()
+    desc = str(product.get('description', '')).lower()
+    category = str(product.get('category_final', 'unknown')).lower()
+    query = query.lower()
+
+    # Brand blocking
+    if query in config['brand_blocks']:
+        blocked_terms = config['brand_blocks'][query]
+        if any(blocked in name for blocked in blocked_terms):
+            return 0
+
+    # Multi-token filter
+    query_tokens = query.split()
+    name_tokens = name.split()
+
+    if len(query_tokens) > 1:
+        matched_count = sum(
+            1 for qt in query_tokens
+            if any(fuzz.ratio(qt, nt) > 85 for nt in name_tokens)
+        )
+        if matched_count < len(query_tokens) * 0.6:
+            return 0
+
+    # Short query strictness
+    if len(query) <= 4:
+        if fuzz.partial_ratio(query, name) < 75:
+            return 0
+
+    # Base fuzzy scoring
+    name_score = fuzz.partial_ratio(query, name)
+    desc_score = fuzz.partial_ratio(query, desc) if pd.notna(product.get('description')) else 0
+    base_score = 0.85 * name_score + 0.15 * desc_score
+
+    # Exact substring bonus
+    if query in name:
+        base_score = min(base_score + 15, 100)
+
+    # Token match bonus
+    has_strong_token_match = any(
+        any(fuzz.ratio(qt, nt) > 85 for nt in name_tokens) for qt in query_tokens
+    )
+    if has_strong_token_match:
+        base_score = min(base_score + 10, 100)
+
+    # Category boost & cross-category penalty
+    boost = boost_dict.get(category, 1.0)
+    boost = max(1.0, min(boost, 3.0))
+
+    for keyword, allowed_cats in config['category_filters'].items():
+        if keyword in query:
+            if not any(allowed in category for allowed in allowed_cats):
+                boost *= 0.2
+
+    final_score = base_score * boost
+
+    # Minimum score thresholds
+    min_score = config['min_score_thresholds'].get(category, config['min_score_thresholds']['default'])
+    if final_score < min_score:
+        return 0
+
+    return final_score
+
+# 5_test_search_ranking_finetuned.py
+def score_product_finetuned(product, query, boost_dict, config):
+    name = str(product['name']).lower()
+    desc = str(product.get('description', '')).lower()
+    category = str(product.get('category_final', 'unknown')).lower()
+    query = query.lower()
+
+    # Fuzzy matching
+    name_score = fuzz.partial_ratio(query, name)
+    desc_score = fuzz.partial_ratio(query, desc) if pd.notna(product.get('description')) else 0
+
+    # Prioritize name heavily
+    base_score = 0.85 * name_score + 0.15 * desc_score
+
+    # Exact substring match bonus
+    if query in name:
+        base_score = min(base_score + 15, 100)
+
+    # Prefer exact word matches
+    name_words = set(name.split())
+    query_words = set(query.split())
+    if query_words.issubset(name_words):
+        base_score = min(base_score + 5, 100)
+
+    # Apply category boost
+    boost = boost_dict.get(category, 1.0)
+    boost = max(1.0, min(boost, 3.0))  # Clamp between 1.0 and 3.0
+
+    final_score = base_score * boost
+
+    # Filter out noise
+    if name_score < 20 and desc_score < 20:
+        return 0
+
+    return final_score
+
+# 3_test_search_ranking.py
+def score_product_ranking(product, query, boost_dict, config):
+    name = str(product['name']).lower()
+    desc = str(product.get('description', '')).lower()
+    category = str(product.get('category_final', 'unknown')).lower()
+    query = query.lower()
+
+    # Fuzzy matching
+    name_score = fuzz.partial_ratio(query, name)
+    desc_score = fuzz.partial_ratio(query, desc) if pd.notna(product.get('description')) else 0
+
+    # Prioritize name heavily
+    base_score = 0.85 * name_score + 0.15 * desc_score
+
+    # Exact substring match bonus
+    if query in name:
+        base_score = min(base_score + 15, 100)
+
+    # Apply category boost with clamp
+    boost = boost_dict.get(category, 1.0)
+    boost = max(1.0, min(boost, 3.0))
+
+    final_score = base_score * boost
+
+    # Filter out noise
+    if name_score < 20 and desc_score < 20:
+        return 0
+
+    return final_score
+
+# test_search_validation.py
+def score_product_validation(product, query, boost_dict, config):
+    name = str(product.get('name', '')).lower()
+    desc = str(product.get('description', '')).lower()
+    category = str(product.get('category_final', 'unknown')).lower()
+    query = query.lower()
+
+    # --- fuzzy match scores ---
+    name_score = fuzz.partial_ratio(query, name)
+    desc_score = fuzz.partial_ratio(query, desc) if desc else 0
+
+    # --- token matching ---
+    query_tokens = set(query.split())
+    name_tokens = set(name.split())
+
+    has_strong_token_match = any(
+        fuzz.ratio(qt, nt) > 85 for qt in query_tokens for nt in name_tokens
+    )
+
+    # --- strict filter ---
+    if name_score < 60 and not has_strong_token_match:
+        if len(query_tokens) == 1 or desc_score < 60:
+            return 0
+
+    boost = max(1.0, min(boost_dict.get(category, 1.0), 3.0))
+    if boost > 2.0 and name_score < 70 and not has_strong_token_match:
+        return 0
+
+    # --- base scoring ---
+    base_score = 0.85 * name_score + 0.15 * desc_score
+    if query in name:
+        base_score = min(base_score + 15, 100)
+    if has_strong_token_match:
+        base_score = min(base_score + 10, 100)
+
+    # --- apply boost ---
+    final_score = base_score * boost
+    return final_score
+
+REFERENCE_SCORERS = {
+    "modular": score_product_modular,
+    "strict": score_product_modular,
+    "finetuned": score_product_finetuned,
+    "ranking": score_product_ranking,
+    "validation": score_product_validation,
+}
+
+# Synthetic products (15% without a description) plus the mock rows, a product the
+# modular samba brand block excludes, and one product with no name, description or
+# category (NaN, as read_csv gives them); boosts from below the clamp to above high_boost
+parity_products = pd.concat([
+    generate_catalog(600, seed=7).drop(columns="id"),
+    pd.DataFrame(data),
+    pd.DataFrame([
+        {"name": "Samsung Samba Shoe", "description": "Classic samba trainers", "category_final": "male shoes"},
+        {"name": np.nan, "description": np.nan, "category_final": np.nan},
+    ]),
+], ignore_index=True)
+parity_boosts = {
+    category: [1.0, 0.5, 1.5, 2.5, 3.5][i % 5]
+    for i, category in enumerate(sorted(parity_products['category_final'].dropna().str.lower().unique()))
+}
+# Batch and multi-word queries, typos, rule keywords, short queries and a no-match query
+parity_queries = list(dict.fromkeys(
+    query_mix() + test_queries + ["lg", "sam", "x", "2.5kva", "samba jeans", "zzqx"]
+))
+
+parity_failures = []
+for profile, score_product in REFERENCE_SCORERS.items():
+    config = {"brand_blocks": {}, **PROFILES[profile]}
+    profile_boosts = PROFILES[profile].get("boosts") or parity_boosts
+    parity_engine = SearchEngine.from_products(parity_products, profile, parity_boosts)
+    for query in parity_queries:
+        expected = parity_products.apply(
+            lambda product: score_product(product, query, profile_boosts, config), axis=1
+        ).to_numpy(dtype=np.float64)
+        if not np.array_equal(parity_engine.score(query), expected):
+            parity_failures.append((profile, query))
+
+status = "✅ PASS" if not parity_failures else f"⚠️ FAIL ({len(parity_failures)} mismatches: {parity_failures})"
+print(f"🧮 Scoring parity: {len(REFERENCE_SCORERS)} profiles x {len(parity_queries)} queries "
+      f"vs per-row score_product: {status}")
+print("="*80)
+assert not parity_failures, parity_failures
+
+# ==========================================
+# CONCURRENCY CHECK
+# ==========================================
+# The catalog is shared read-only: searches from many threads at once must give
+# exactly the serial results. Each concurrent pass starts from a fresh modular
+# engine over 20k products, so the lazily built name sort keys, category partitions
+# (filter queries scan only the feasible ones) and description summaries are first
+# built by concurrent searches.
+CONCURRENT_THREADS = 8
+CONCURRENT_ROUNDS = 4
+
+concurrent_products = generate_catalog(20000, seed=3)
+concurrent_boosts = {
+    category: [1.0, 1.5, 2.5][i % 3]
+    for i, category in enumerate(sorted(concurrent_products['category_final'].str.lower().unique()))
+}
+concurrent_queries = list(dict.fromkeys(
+    test_queries + ["samba", "jeans", "air fryer", "apple phone", "iphon", "samsung galaxy pro", "lg"]
+)) * CONCURRENT_ROUNDS
+
+
+def modular_engine():
+    """A fresh engine: nothing lazily built yet"""
+    return SearchEngine.from_products(concurrent_products, "modular", concurrent_boosts)
+
+
+def concurrent_mismatches(search_fn, serial):
+    with ThreadPoolExecutor(max_workers=CONCURRENT_THREADS) as pool:
+        found = list(pool.map(search_fn, concurrent_queries))
+    return sorted({
+        query for query, results in zip(concurrent_queries, found)
+        if not results.equals(serial[query]) or list(results.index) != list(serial[query].index)
+    })
+
+
+def check_concurrency(label, mismatches):
+    status = "✅ PASS" if not mismatches else f"⚠️ FAIL ({len(mismatches)} mismatched queries: {mismatches})"
+    print(f"🧵 Concurrent search ({label}): {len(concurrent_queries)} queries on "
+          f"{CONCURRENT_THREADS} threads vs serial: {status}")
+    assert not mismatches, (label, mismatches)
+
+
+reference_engine = modular_engine()
+for summarize in (False, True):
+    serial = {
+        query: reference_engine.search(query, top_n=10, summarize_descriptions=summarize)
+        for query in concurrent_queries
+    }
+    fresh = modular_engine()
+    check_concurrency(
+        "description summaries" if summarize else "full descriptions",
+        concurrent_mismatches(lambda q: fresh.search(q, top_n=10, summarize_descriptions=summarize), serial),
+    )
+
+# The cached, synonym-rewriting path of modular_testing.search(), with the synonym
+# file reloaded over and over while the searches run
+with tempfile.TemporaryDirectory() as tmp:
+    synonyms_path = os.path.join(tmp, "synonyms.json")
+    shutil.copy(os.path.join(os.path.dirname(os.path.abspath(__file__)), "synonyms.json"), synonyms_path)
+    synonyms = SynonymTable(synonyms_path, check_interval=0)
+    search_cache = SearchCache(maxsize=8, ttl=600)
+    fresh = modular_engine()
+
+    def cached_search(query, top_n=10):
+        query = synonyms.canonicalize(query)
+        key = (query.lower(), False)
+        version = (fresh.catalog.version, fresh.rules.fingerprint)
+        results = search_cache.get(key, top_n, version)
+        if results is None:
+            results = fresh.search(query, top_n)
+            search_cache.put(key, top_n, results, version)
+        return results
+
+    serial = {query: reference_engine.search(synonyms.canonicalize(query), top_n=10) for query in concurrent_queries}
+    done = threading.Event()
+
+    def touch_synonyms():
+        mtime = os.stat(synonyms_path).st_mtime_ns
+        while not done.is_set():
+            mtime += 1
+            os.utime(synonyms_path, ns=(mtime, mtime))
+            done.wait(0.001)
+
+    toucher = threading.Thread(target=touch_synonyms)
+    toucher.start()
+    try:
+        mismatches = concurrent_mismatches(cached_search, serial)
+    finally:
+        done.set()
+        toucher.join()
+    check_concurrency("cache + synonym reloads", mismatches)
+print("="*80)
+
+# ==========================================
+# BATCH SEARCH CHECK
+# ==========================================
+# search_many() must return what search() returns for each query (duplicates, case
+# variants, no-match and empty queries, an empty batch), both from the engine and
+# through modular_testing's cached wrapper: once cold, once with every query a cache
+# hit. modular_testing runs in a scratch directory over a small catalog CSV.
+def same_results(a, b):
+    return a.equals(b) and list(a.index) == list(b.index)
+
+
+batch_queries = ["iphone", "IPHONE", "air fryer", "samba", "iphone", "apple phone", "zzqx", "lg", ""]
+batch_failures = []
+if reference_engine.search_many([]) != []:
+    batch_failures.append("engine: empty batch")
+batch_failures += [
+    f"engine: {query!r}" for query, results in zip(batch_queries, reference_engine.search_many(batch_queries))
+    if not same_results(results, reference_engine.search(query))
+]
+
+with tempfile.TemporaryDirectory() as tmp:
+    generate_catalog(2000, seed=5).to_csv(os.path.join(tmp, "products_with_inferred_categories.csv"), index=False)
+    pd.DataFrame({"category": list(concurrent_boosts), "boost": list(concurrent_boosts.values())}).to_csv(
+        os.path.join(tmp, "category_boost_fixed.csv"), index=False
+    )
+    shutil.copy(os.path.join(os.path.dirname(os.path.abspath(__file__)), "synonyms.json"), tmp)
+    previous_cwd = os.getcwd()
+    os.chdir(tmp)
+    try:
+        import modular_testing
+
+        expected = [modular_testing.uncached_search(query) for query in batch_queries]
+        for label in ("cold cache", "all cache hits"):
+            hits = modular_testing.search_cache.hits
+            found = modular_testing.search_many(batch_queries)
+            batch_failures += [
+                f"{label}: {query!r}" for query, results, want in zip(batch_queries, found, expected)
+                if not same_results(results, want)
+            ]
+            if label == "all cache hits" and modular_testing.search_cache.hits == hits:
+                batch_failures.append(f"{label}: no cache hits")
+        if modular_testing.search_many([]) != []:
+            batch_failures.append("cached: empty batch")
+    finally:
+        os.chdir(previous_cwd)
+
+status = "✅ PASS" if not batch_failures else f"⚠️ FAIL ({batch_failures})"
+print(f"📦 search_many vs search: {len(batch_queries)} queries (engine, cold cache, all cache hits): {status}")
+print("="*80)
+assert not batch_failures, batch_failures